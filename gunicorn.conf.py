@@ -0,0 +1,17 @@
+# Gunicorn settings for serving uls-webapp in production:
+#   gunicorn wsgi:app
+# (gunicorn reads this file from the working directory automatically)
+import os
+
+bind = f"0.0.0.0:{os.environ.get('ULS_PORT', '5120')}"
+
+# Threaded workers, so requests waiting on SQLite overlap within a process.
+# Each worker keeps its own connection pool with a large page cache, so the
+# worker count stays small and fixed rather than following the core count.
+workers = int(os.environ.get('ULS_WORKERS', 2))
+worker_class = 'gthread'
+threads = 8
+
+# Not preloaded: importing the app opens pooled SQLite connections, which
+# must not be shared with forked workers
+preload_app = False
@@ -0,0 +1,152 @@
+"""
+Tests for the ULS web application
+Builds a small database with the importer's schema and drives the app through
+Flask's test client. Run with: python -m unittest discover tests
+"""
+
+import importlib.util
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from uls_importer import ULSImporter
+
+SCHEMA_FILE = os.path.join(ROOT, 'public_access_database_definitions_sql_20250417.txt')
+
+webapp = None
+_tmpdir = None
+
+def build_database(path):
+    """Create the importer's schema and load a handful of licenses and applications"""
+    importer = ULSImporter(path)
+    importer.connect()
+    importer.create_schema(SCHEMA_FILE)
+    importer.disconnect()
+    
+    conn = sqlite3.connect(path)
+    for usi in range(1, 6):
+        conn.execute(
+            "INSERT INTO PUBACC_HD (record_type, unique_system_identifier, uls_file_number, call_sign, "
+            "license_status, radio_service_code, grant_date, expired_date) VALUES ('HD', ?, ?, ?, 'A', 'HA', "
+            "'01/01/2020', '01/01/2030')",
+            (usi, f"{usi:010d}", f"K{usi}AAA")
+        )
+        conn.execute(
+            "INSERT INTO PUBACC_EN (record_type, unique_system_identifier, entity_type, entity_name, "
+            "first_name, last_name, frn, city, state) VALUES ('EN', ?, 'L', NULL, 'Pat', ?, ?, 'Dallas', 'TX')",
+            (usi, f"Smith{usi}", f"{usi:010d}")
+        )
+    # Application rows, including file numbers that appear more than once with
+    # different statuses, as they do in real ULS data
+    applications = [
+        (1, '0000000101', 'P', '01/01/2024'),
+        (1, '0000000101', 'G', '01/02/2024'),
+        (2, '0000000102', 'G', '01/03/2024'),
+        (2, '0000000102', 'P', '01/04/2024'),
+        (3, '0000000103', 'P', '01/05/2024'),
+        (4, '0000000104', 'G', '01/06/2024'),
+        (5, '0000000105', 'P', '01/07/2024'),
+        (5, '0000000105', 'P', '01/08/2024'),
+    ]
+    conn.executemany(
+        "INSERT INTO PUBACC_AD (record_type, unique_system_identifier, uls_file_number, "
+        "application_status, receipt_date) VALUES ('AD', ?, ?, ?, ?)",
+        applications
+    )
+    conn.execute(
+        "INSERT INTO import_tracking (file_name, file_type, import_type, import_date, status) "
+        "VALUES ('test.zip', 'license', 'full', '2026-01-01 00:00:00', 'completed')"
+    )
+    conn.commit()
+    conn.close()
+
+def setUpModule():
+    global webapp, _tmpdir
+    _tmpdir = tempfile.mkdtemp()
+    db_path = os.path.join(_tmpdir, 'uls.db')
+    build_database(db_path)
+    os.environ['ULS_DATABASE'] = db_path
+    
+    spec = importlib.util.spec_from_file_location('uls_webapp_under_test', os.path.join(ROOT, 'uls-webapp.py'))
+    webapp = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(webapp)
+    webapp.app.config['TESTING'] = True
+
+def tearDownModule():
+    webapp.close_pool()
+    shutil.rmtree(_tmpdir, ignore_errors=True)
+
+
+class ConnectionPoolTests(unittest.TestCase):
+    
+    def test_export_checks_its_connection_in_once(self):
+        client = webapp.app.test_client()
+        client.get('/api/search?type=callsign&q=K1AAA').close()
+        for headers in ({}, {'Accept-Encoding': 'gzip'}):
+            response = client.get('/api/export/csv?type=name&q=smith', headers=headers)
+            self.assertEqual(response.status_code, 200)
+            response.get_data()
+            response.close()
+        
+        pooled = list(webapp._db_pool.queue)
+        self.assertTrue(pooled)
+        self.assertEqual(len(pooled), len({id(conn) for conn in pooled}))
+
+
+
+class ApplicationSearchTests(unittest.TestCase):
+    
+    def test_status_search_returns_only_matching_rows(self):
+        client = webapp.app.test_client()
+        for sort_order in ('desc', 'asc'):
+            response = client.get(f'/api/search?type=application_status&q=P&sort_order={sort_order}')
+            self.assertEqual(response.status_code, 200)
+            data = response.get_json()
+            
+            file_numbers = [row['uls_file_number'] for row in data['results']]
+            self.assertEqual(len(file_numbers), data['total'])
+            self.assertEqual(len(file_numbers), len(set(file_numbers)))
+            for row in data['results']:
+                self.assertEqual(row['application_status_code'], 'P')
+
+
+
+class PrefetchTests(unittest.TestCase):
+    
+    def test_prefetch_reports_requested_page_size(self):
+        client = webapp.app.test_client()
+        for args, key in (('type=name&q=smith', 'unique_system_identifier'),
+                          ('type=recent_applications', 'uls_file_number')):
+            data = client.get(f'/api/search?{args}&per_page=2&prefetch_pages=2').get_json()
+            self.assertEqual(data['per_page'], 2)
+            self.assertEqual(data['prefetch_pages'], 2)
+            self.assertEqual(data['total'], 5)
+            self.assertEqual(data['total_pages'], 3)
+            self.assertEqual(len({row[key] for row in data['results']}), 4)
+            self.assertTrue(data['next_cursor'])
+
+
+class CacheValidatorTests(unittest.TestCase):
+    
+    def test_not_modified_keeps_validators(self):
+        client = webapp.app.test_client()
+        for path, max_age in (('/api/search?type=callsign&q=K1AAA', webapp.app.config['API_CACHE_MAX_AGE']),
+                              ('/api/regions', webapp.app.config['REGIONS_CACHE_MAX_AGE'])):
+            first = client.get(path)
+            self.assertEqual(first.status_code, 200)
+            etag = first.headers['ETag']
+            
+            again = client.get(path, headers={'If-None-Match': etag})
+            self.assertEqual(again.status_code, 304)
+            self.assertEqual(again.headers.get('ETag'), etag)
+            self.assertEqual(again.cache_control.max_age, max_age)
+
+
+if __name__ == '__main__':
+    unittest.main()
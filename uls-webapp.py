@@ -5,16 +5,36 @@ Provides search interface and CSV export for ULS license and application data
 Includes PDF license generation for amateur radio licenses
 """
 
-from flask import Flask, render_template, request, jsonify, send_file, Response
+from flask import Flask, request, jsonify, send_file, Response, stream_with_context, g, has_app_context
 import sqlite3
 import csv
 import io
 import os
+import json
+import base64
+import gzip
+import zlib
+import atexit
+import hashlib
+import queue
+import time
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
+from html import escape
 import logging
 from license_pdf_generator import LicensePDFGenerator, create_license_pdf_from_callsign
 
+try:
+    import orjson  # Optional: much faster JSON encoding for wide result sets
+except ImportError:
+    orjson = None
+
+try:
+    import brotli  # Optional: smaller page transfers for browsers that accept br
+except ImportError:
+    brotli = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -24,50 +44,688 @@ app.config['DATABASE'] = os.environ.get('ULS_DATABASE', 'uls.db')
 app.config['MAX_EXPORT_RESULTS'] = 50000  # Increased from 1000
 app.config['DEFAULT_PAGE_SIZE'] = 50
 app.config['MAX_PAGE_SIZE'] = 1000  # Allow up to 1000 results per page
+app.config['MAX_PREFETCH_PAGES'] = 3  # Pages one prefetch request may span
+app.config['DB_POOL_SIZE'] = 16  # Idle connections kept open between requests
+app.config['DB_STATEMENT_CACHE'] = 256  # Prepared statements kept per connection
+app.config['DB_CACHE_SIZE_KB'] = 262144  # 256MB page cache per pooled connection
+app.config['DB_MMAP_SIZE'] = 1073741824  # Map up to 1GB of the database file
+app.config['DB_BUSY_TIMEOUT'] = 5.0  # Seconds to wait on a lock held by an import
+app.config['DETAIL_QUERY_WORKERS'] = 4  # Detail lookups run side by side
+app.config['SERVER_THREADS'] = 16  # Request threads when serving with waitress
+app.config['PORT'] = int(os.environ.get('ULS_PORT', 5120))  # Port the built-in servers listen on
+app.config['RECENT_COUNT_CAP'] = 10000  # Recent applications are counted up to this many
+app.config['DATA_VERSION_TTL'] = 60  # Seconds between checks for a newer import
+app.config['SEARCH_TOTAL_CACHE'] = 1024  # Search totals remembered between pages
+app.config['API_CACHE_MAX_AGE'] = 300  # Seconds browsers may reuse an API response
+app.config['REGIONS_CACHE_MAX_AGE'] = 86400  # Same for the state list, which only an import changes
+app.config['PAGE_CACHE_MAX_AGE'] = 3600  # Seconds browsers may reuse the search page
+app.config['COMPRESS_MIN_SIZE'] = 1024  # Smaller API responses are sent uncompressed
+app.config['COMPRESS_LEVEL'] = 5  # gzip level for API responses and CSV exports
 
-# Database connection
-def get_db():
-    """Create database connection with optimizations"""
-    conn = sqlite3.connect(app.config['DATABASE'])
+# Map regions to states
+REGION_STATES = {
+    'northeast': ('CT', 'ME', 'MA', 'NH', 'NJ', 'NY', 'PA', 'RI', 'VT'),
+    'southeast': ('AL', 'AR', 'FL', 'GA', 'KY', 'LA', 'MS', 'NC', 'SC', 'TN', 'VA', 'WV'),
+    'midwest': ('IL', 'IN', 'IA', 'KS', 'MI', 'MN', 'MO', 'NE', 'ND', 'OH', 'SD', 'WI'),
+    'southwest': ('AZ', 'NM', 'OK', 'TX'),
+    'west': ('AK', 'CA', 'CO', 'HI', 'ID', 'MT', 'NV', 'OR', 'UT', 'WA', 'WY')
+}
+# Region filter fragment and its bound states, built once
+REGION_SQL = {
+    region: (f"e.state IN ({','.join('?' * len(states))})", states)
+    for region, states in REGION_STATES.items()
+}
+
+# Map application purpose codes
+PURPOSE_MAP = {
+    'NE': 'New',
+    'AM': 'Amendment',
+    'RO': 'Renewal Only',
+    'RM': 'Renewal/Modification',
+    'AU': 'Administrative Update',
+    'CA': 'Cancellation',
+    'MD': 'Modification',
+    'WD': 'Withdrawal'
+}
+
+# Map application status codes
+STATUS_MAP = {
+    'P': 'Pending',
+    'A': 'Accepted',
+    'G': 'Granted',
+    'D': 'Dismissed',
+    'W': 'Withdrawn',
+    'Q': 'Accepted in Part',
+    'T': 'Terminated',
+    'K': 'Killed',
+    'R': 'Returned',
+    'I': 'In Progress'
+}
+
+def code_label_sql(column, labels):
+    """Build a CASE expression that maps a code column to its display label"""
+    cases = ' '.join(f"WHEN '{code}' THEN '{label}'" for code, label in labels.items())
+    return f"CASE {column} {cases} ELSE COALESCE({column}, '') END"
+
+PURPOSE_LABEL_SQL = code_label_sql('ad.application_purpose', PURPOSE_MAP)
+STATUS_LABEL_SQL = code_label_sql('ad.application_status', STATUS_MAP)
+
+# Display name: entity name, else "first last", else last name
+ENTITY_NAME_SQL = """COALESCE(
+                NULLIF(COALESCE(e.entity_name, e.last_name || ', ' || e.first_name), ''),
+                CASE WHEN e.first_name <> '' AND e.last_name <> '' THEN e.first_name || ' ' || e.last_name END,
+                NULLIF(e.last_name, ''),
+                ''
+            )"""
+
+ADDRESS_SQL = """TRIM(COALESCE(e.street_address, '') || ', ' || COALESCE(e.city, '') || ', ' ||
+                 COALESCE(e.state, '') || ' ' || COALESCE(e.zip_code, ''), ', ')"""
+
+# Result columns for /api/search by JSON field name, in response order
+LICENSE_RESULT_COLUMNS = {
+    'type': "'license'",
+    'unique_system_identifier': 'h.unique_system_identifier',
+    'call_sign': "COALESCE(h.call_sign, '')",
+    'uls_file_number': "COALESCE(h.uls_file_number, '')",
+    'radio_service_code': "COALESCE(h.radio_service_code, '')",
+    'grant_date': "COALESCE(h.grant_date, '')",
+    'expired_date': "COALESCE(h.expired_date, '')",
+    'license_status': "COALESCE(h.license_status, '')",
+    'entity_name': ENTITY_NAME_SQL,
+    'frn': "COALESCE(e.frn, '')",
+    'address': ADDRESS_SQL,
+    'city': "COALESCE(e.city, '')",
+    'state': "COALESCE(e.state, '')",
+    'email': "COALESCE(e.email, '')",
+    'phone': "COALESCE(e.phone, '')"
+}
+
+APPLICATION_RESULT_COLUMNS = {
+    'type': "'application'",
+    'unique_system_identifier': 'ad.unique_system_identifier',
+    'uls_file_number': "COALESCE(ad.uls_file_number, '')",
+    'ebf_number': "COALESCE(ad.ebf_number, '')",
+    'call_sign': "COALESCE(NULLIF(h.call_sign, ''), 'N/A')",
+    'radio_service_code': "COALESCE(h.radio_service_code, '')",
+    'application_purpose': PURPOSE_LABEL_SQL,
+    'application_purpose_code': "COALESCE(ad.application_purpose, '')",
+    'application_status': STATUS_LABEL_SQL,
+    'application_status_code': "COALESCE(ad.application_status, '')",
+    'receipt_date': "COALESCE(ad.receipt_date, '')",
+    'notification_date': "COALESCE(ad.notification_date, '')",
+    'entity_name': ENTITY_NAME_SQL,
+    'frn': "COALESCE(e.frn, '')",
+    'address': ADDRESS_SQL,
+    'email': "COALESCE(e.email, '')",
+    'phone': "COALESCE(e.phone, '')"
+}
+
+# Sortable columns for /api/search by sort_by value
+LICENSE_SORT_COLUMNS = {
+    'call_sign': 'h.call_sign',
+    'entity_name': "COALESCE(e.entity_name, e.last_name || ', ' || e.first_name)",
+    'license_status': 'h.license_status',
+    'grant_date': 'h.grant_date',
+    'expired_date': 'h.expired_date',
+    'state': 'e.state',
+    'city': 'e.city',
+    'frn': 'e.frn',
+    'unique_system_identifier': 'h.unique_system_identifier',
+    'radio_service_code': 'h.radio_service_code'
+}
+
+APPLICATION_SORT_COLUMNS = {
+    'uls_file_number': 'ad.uls_file_number',
+    'call_sign': 'h.call_sign',
+    'application_purpose': 'ad.application_purpose',
+    'application_status': 'ad.application_status',
+    'receipt_date': 'ad.receipt_date',
+    'entity_name': "COALESCE(e.entity_name, e.last_name || ', ' || e.first_name)",
+    'frn': 'e.frn'
+}
+
+# Regions offered by /api/regions, in display order
+REGIONS = [
+    {'code': 'northeast', 'name': 'Northeast'},
+    {'code': 'southeast', 'name': 'Southeast'},
+    {'code': 'midwest', 'name': 'Midwest'},
+    {'code': 'southwest', 'name': 'Southwest'},
+    {'code': 'west', 'name': 'West'}
+]
+
+# Fields served by /api/stats, in response order
+STATS_KEYS = ('total_licenses', 'active_licenses', 'total_applications',
+              'pending_applications', 'top_services', 'last_update')
+
+# Database connection pool, so page cache and PRAGMA setup survive across requests
+_db_pool = queue.LifoQueue()
+
+# Worker threads for detail lookups; each query takes its own pooled connection
+_detail_executor = ThreadPoolExecutor(max_workers=app.config['DETAIL_QUERY_WORKERS'])
+
+def checkout_db():
+    """Take a pooled database connection, opening a new one if none are idle"""
+    try:
+        return _db_pool.get_nowait()
+    except queue.Empty:
+        pass
+    conn = sqlite3.connect(app.config['DATABASE'], check_same_thread=False,
+                           timeout=app.config['DB_BUSY_TIMEOUT'],
+                           cached_statements=app.config['DB_STATEMENT_CACHE'])
     conn.row_factory = sqlite3.Row
     # Performance optimizations
-    conn.execute("PRAGMA cache_size = -64000")  # 64MB cache
+    conn.execute(f"PRAGMA cache_size = -{app.config['DB_CACHE_SIZE_KB']}")
+    conn.execute(f"PRAGMA mmap_size = {app.config['DB_MMAP_SIZE']}")
     conn.execute("PRAGMA temp_store = MEMORY")
+    # Under WAL only checkpoints need to fsync
+    conn.execute("PRAGMA synchronous = NORMAL")
+    return conn
+
+def close_db(conn):
+    """Close a connection, first letting SQLite refresh statistics for the queries it ran"""
+    try:
+        conn.execute("PRAGMA optimize")
+    except sqlite3.Error as e:
+        logger.warning(f"PRAGMA optimize failed: {e}")
+    conn.close()
+
+def enable_wal():
+    """Switch the database to WAL so searches keep running while an import writes"""
+    # journal_mode is stored in the file, so this only has to happen once
+    try:
+        conn = sqlite3.connect(app.config['DATABASE'])
+        try:
+            mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+        finally:
+            conn.close()
+        if mode != 'wal':
+            logger.warning(f"Database journal mode is {mode}, not WAL")
+    except sqlite3.Error as e:
+        logger.warning(f"Could not enable WAL mode: {e}")
+
+def optimize_db():
+    """Let SQLite refresh planner statistics that are missing or out of date"""
+    # 0x10000 has SQLite 3.46+ check every table, as suits a fresh
+    # connection; older versions ignore the bit and run a plain optimize
+    try:
+        conn = sqlite3.connect(app.config['DATABASE'], timeout=app.config['DB_BUSY_TIMEOUT'])
+        try:
+            conn.execute("PRAGMA optimize = 0x10002")
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning(f"PRAGMA optimize failed: {e}")
+
+def checkin_db(conn):
+    """Return a connection to the pool, closing it if the pool is already full"""
+    if _db_pool.qsize() >= app.config['DB_POOL_SIZE']:
+        close_db(conn)
+    else:
+        _db_pool.put(conn)
+
+def get_db():
+    """Get the connection for the current request, checking one out on first use.
+    
+    Every query a request makes shares the one connection, which goes back to
+    the pool at teardown. Outside an app context (the detail worker threads)
+    each call checks out a connection of its own.
+    """
+    if not has_app_context():
+        return checkout_db()
+    conn = getattr(g, '_db', None)
+    if conn is None:
+        conn = g._db = checkout_db()
     return conn
 
+def release_db(conn):
+    """Release a connection from get_db(); the request's own waits for teardown"""
+    if has_app_context() and getattr(g, '_db', None) is conn:
+        return
+    checkin_db(conn)
+
+@app.teardown_appcontext
+def release_request_db(exception):
+    """Return the request's connection to the pool"""
+    conn = g.pop('_db', None)
+    if conn is not None:
+        checkin_db(conn)
+
+@atexit.register
+def close_pool():
+    """Close the idle pooled connections when the server exits"""
+    while True:
+        try:
+            close_db(_db_pool.get_nowait())
+        except queue.Empty:
+            break
+
 def query_db(query, args=(), one=False):
     """Execute database query"""
     try:
         conn = get_db()
+    except Exception as e:
+        logger.error(f"Database connection error: {e}")
+        return None if one else []
+    try:
         cur = conn.execute(query, args)
         rv = cur.fetchall()
-        conn.close()
         return (rv[0] if rv else None) if one else rv
     except Exception as e:
         logger.error(f"Database query error: {e}")
         return None if one else []
+    finally:
+        release_db(conn)
 
-@lru_cache(maxsize=128)
-def get_states():
-    """Get list of states from database"""
-    results = query_db("SELECT DISTINCT state FROM PUBACC_EN WHERE state IS NOT NULL ORDER BY state")
-    return [r['state'] for r in results]
-
-@lru_cache(maxsize=128)
-def get_service_codes():
-    """Get list of radio service codes"""
-    results = query_db("""
-        SELECT DISTINCT radio_service_code 
-        FROM PUBACC_HD 
-        WHERE radio_service_code IS NOT NULL 
-        ORDER BY radio_service_code
-    """)
-    return [r['radio_service_code'] for r in results]
+def query_dicts(query, args=()):
+    """Execute a query and return its rows as plain dicts.
+    
+    Rows are fetched as tuples and zipped against the column names read once
+    from the cursor. When a name repeats (SELECT ad.*, e.*) the value comes
+    from the first column matching it case-insensitively, exactly as
+    sqlite3.Row resolves names.
+    """
+    try:
+        conn = get_db()
+    except Exception as e:
+        logger.error(f"Database connection error: {e}")
+        return []
+    try:
+        cur = conn.cursor()
+        cur.row_factory = None
+        cur.execute(query, args)
+        rows = cur.fetchall()
+        names = [column[0] for column in cur.description]
+    except Exception as e:
+        logger.error(f"Database query error: {e}")
+        return []
+    finally:
+        release_db(conn)
+    
+    fields = list(dict.fromkeys(names))
+    folded = [name.lower() for name in names]
+    if len(set(folded)) == len(names):
+        return [dict(zip(names, row)) for row in rows]
+    positions = [folded.index(field.lower()) for field in fields]
+    return [dict(zip(fields, map(row.__getitem__, positions))) for row in rows]
+
+def json_response(data, status=200):
+    """Serialize an API response, using orjson when it is installed"""
+    if orjson is None:
+        return jsonify(data), status
+    return Response(orjson.dumps(data), status=status, mimetype='application/json')
+
+def distinct_values(table, column):
+    """List a column's distinct non-NULL values in order by skipping through its index.
+    
+    Each value costs one MIN() probe, so the few dozen states or service codes
+    are read without a DISTINCT walk over every row's index entry.
+    """
+    values = []
+    row = query_db(f"SELECT MIN({column}) AS value FROM {table}", one=True)
+    while row and row['value'] is not None:
+        values.append(row['value'])
+        row = query_db(f"SELECT MIN({column}) AS value FROM {table} WHERE {column} > ?",
+                       [row['value']], one=True)
+    return values
+
+@lru_cache(maxsize=1)
+def get_states(version=None):
+    """Get list of states from database, cached until the import version changes"""
+    return distinct_values('PUBACC_EN', 'state')
+
+@lru_cache(maxsize=1)
+def get_service_codes(version=None):
+    """Get list of radio service codes, cached until the import version changes"""
+    return distinct_values('PUBACC_HD', 'radio_service_code')
+
+def licensee_join(key_column, join='LEFT JOIN'):
+    """Join a single PUBACC_EN row per license, preferring the licensee record.
+    
+    A license can carry several entity rows (licensee, contact, ...), and a
+    plain join fans every result out once per row. Pass join='JOIN' when the
+    WHERE clause filters on entity columns so the planner may drive from them.
+    """
+    return f"""{join} PUBACC_EN e ON e.unique_system_identifier = {key_column}
+        AND e.rowid = (
+            SELECT rowid FROM PUBACC_EN
+            WHERE unique_system_identifier = {key_column}
+            ORDER BY entity_type <> 'L', rowid
+            LIMIT 1
+        )"""
+
+@lru_cache(maxsize=1)
+def has_name_index(version=None):
+    """Check whether the importer built the trigram name search index, rechecked per import"""
+    result = query_db(
+        "SELECT 1 AS present FROM sqlite_master WHERE type = 'table' AND name = 'PUBACC_EN_FTS'",
+        one=True
+    )
+    return result is not None
+
+def fts_phrase(text):
+    """Quote text as a single FTS5 phrase"""
+    return '"' + text.replace('"', '""') + '"'
+
+def name_condition(query_value):
+    """Build the WHERE clause for a name search.
+    
+    Two or more words match first/last name in either order or the whole
+    string within entity_name; a single word matches any of the three.
+    The trigram index gives the same substring semantics as LIKE '%x%'
+    but only for terms of at least three characters; shorter words are
+    matched with LIKE among the rows the index finds for the longer one.
+    """
+    # Parse name (could be "first last" or "last, first")
+    name_parts = query_value.replace(',', ' ').split()
+    indexed = has_name_index(get_data_version())
+    terms = name_parts[:2] + [query_value] if len(name_parts) >= 2 else [query_value]
+    
+    if indexed and all(len(term) >= 3 for term in terms):
+        if len(name_parts) >= 2:
+            first, last, full = (fts_phrase(term) for term in terms)
+            match = (f"(first_name : {first} AND last_name : {last}) OR "
+                     f"(first_name : {last} AND last_name : {first}) OR "
+                     f"entity_name : {full}")
+        else:
+            match = fts_phrase(query_value)
+        return "WHERE e.rowid IN (SELECT rowid FROM PUBACC_EN_FTS WHERE PUBACC_EN_FTS MATCH ?)", [match]
+    
+    # LIKE already ignores ASCII case, so the columns are compared as stored
+    if len(name_parts) >= 2:
+        where_clause = """
+            WHERE (
+                (e.first_name LIKE ? AND e.last_name LIKE ?) OR
+                (e.first_name LIKE ? AND e.last_name LIKE ?) OR
+                e.entity_name LIKE ?
+            )
+        """
+        params = [
+            f"%{name_parts[0]}%", f"%{name_parts[1]}%",
+            f"%{name_parts[1]}%", f"%{name_parts[0]}%",
+            f"%{query_value}%"
+        ]
+        long_parts = [part for part in name_parts[:2] if len(part) >= 3]
+        if indexed and long_parts:
+            # A short first name ("Al Smith") can't be looked up by trigram, but
+            # every match still holds the longer word in first or last name, so
+            # the index narrows the rows before LIKE checks the rest
+            match = (f"{{first_name last_name}} : {fts_phrase(long_parts[0])} OR "
+                     f"entity_name : {fts_phrase(query_value)}")
+            where_clause = where_clause.replace(
+                "WHERE (",
+                "WHERE e.rowid IN (SELECT rowid FROM PUBACC_EN_FTS WHERE PUBACC_EN_FTS MATCH ?) AND (",
+                1
+            )
+            params.insert(0, match)
+    else:
+        where_clause = """
+            WHERE (
+                e.first_name LIKE ? OR 
+                e.last_name LIKE ? OR 
+                e.entity_name LIKE ?
+            )
+        """
+        params = [f"%{query_value}%"] * 3
+    return where_clause, params
+
+def result_columns(columns, fields, required):
+    """Build the SELECT list for the requested result fields, keeping response order"""
+    if fields:
+        # Names are matched against the column table, never interpolated
+        wanted = set(fields.split(',')).union(required)
+        columns = {name: expr for name, expr in columns.items() if name in wanted}
+    return ',\n            '.join(f"{expr} AS {name}" for name, expr in columns.items())
+
+def encode_cursor(sort_key, tiebreaker):
+    """Encode the last row's sort position as an opaque pagination cursor"""
+    raw = json.dumps([sort_key, tiebreaker]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+def decode_cursor(cursor):
+    """Decode a pagination cursor, returning None if it is malformed"""
+    try:
+        value = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, TypeError):
+        return None
+    # Only a [sort_key, tiebreaker] pair of plain values may reach SQL binding
+    if not isinstance(value, list) or len(value) != 2:
+        return None
+    if not all(item is None or (isinstance(item, (str, int, float)) and not isinstance(item, bool))
+               for item in value):
+        return None
+    return value[0], value[1]
+
+def keyset_condition(sort_column, tiebreak_column, descending, after):
+    """Build a seek predicate that starts a page just past the cursor row.
+    
+    SQLite sorts NULLs first in ascending order and last in descending order,
+    so NULL sort keys need their own branches. The tiebreak column must be
+    unique and NOT NULL.
+    """
+    sort_key, tiebreaker = after
+    cmp = '<' if descending else '>'
+    if sort_key is None:
+        if descending:
+            return f"({sort_column} IS NULL AND {tiebreak_column} {cmp} ?)", [tiebreaker]
+        return (f"({sort_column} IS NOT NULL OR "
+                f"({sort_column} IS NULL AND {tiebreak_column} {cmp} ?))"), [tiebreaker]
+    # A row value comparison lets SQLite seek straight to the cursor in a
+    # (sort, tiebreak) index instead of scanning up to it
+    condition = f"(({sort_column}, {tiebreak_column}) {cmp} (?, ?)"
+    if descending:
+        condition += f" OR {sort_column} IS NULL"
+    return condition + ")", [sort_key, tiebreaker]
+
+def iter_csv(conn, cursor, header, batch_size=500):
+    """Yield CSV text in batches from a live cursor, checking conn back in when done"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    
+    def flush():
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return value
+    
+    try:
+        writer.writerow(header)
+        yield flush()
+        # Rows arrive as plain tuples in header order; csv writes None as ''
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            writer.writerows(rows)
+            yield flush()
+    finally:
+        cursor.close()
+        checkin_db(conn)
+
+def gzip_stream(chunks, level):
+    """Gzip a stream of text chunks as they are produced"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+def stream_csv(query, params, header, filename):
+    """Run an export query and stream its rows back as a CSV attachment"""
+    # The app context, and the request connection pinned in it, is torn down as
+    # soon as this view returns, long before the stream is read. The export
+    # therefore takes a connection of its own, which only the stream checks in.
+    conn = checkout_db()
+    try:
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(query, params)
+    except Exception as e:
+        checkin_db(conn)
+        logger.error(f"Export query error: {e}")
+        return json_response({'error': 'Export failed'}, 500)
+    
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    headers = {
+        'Content-Disposition': f'attachment; filename={filename}_{timestamp}.csv',
+        # Keep a proxy such as nginx from buffering the whole export before sending it on
+        'X-Accel-Buffering': 'no',
+        'Vary': 'Accept-Encoding'
+    }
+    
+    # Exports are compressed batch by batch so they still stream
+    body = iter_csv(conn, cursor, header)
+    if 'gzip' in request.accept_encodings:
+        body = gzip_stream(body, app.config['COMPRESS_LEVEL'])
+        headers['Content-Encoding'] = 'gzip'
+    
+    return Response(stream_with_context(body), mimetype='text/csv', headers=headers)
+
+# Last completed import, re-read from import_tracking at most every DATA_VERSION_TTL
+_data_version = {'value': None, 'checked': None}
+
+def get_data_version():
+    """Return the timestamp of the most recent completed import"""
+    now = time.monotonic()
+    checked = _data_version['checked']
+    if checked is None or now - checked > app.config['DATA_VERSION_TTL']:
+        result = query_db(
+            "SELECT MAX(import_date) AS last_import FROM import_tracking WHERE status = 'completed'",
+            one=True
+        )
+        _data_version['value'] = result['last_import'] if result else None
+        _data_version['checked'] = now
+    return _data_version['value']
+
+# Search totals keyed by data version and count query, so paging a result
+# set by cursor counts it once rather than once per page
+_search_totals = {}
+
+def search_total(count_query, count_params, known=None):
+    """Return the total for a search, running count_query only on a cache miss.
+    
+    Pass known when the page query already counted the rows. Nothing is
+    cached without an import version to tell when the totals go stale.
+    """
+    version = get_data_version()
+    key = (version, count_query, tuple(count_params))
+    total = known if known is not None else _search_totals.get(key)
+    if total is None:
+        result = query_db(count_query, count_params, one=True)
+        total = result['total'] if result else 0
+    if version:
+        if len(_search_totals) >= app.config['SEARCH_TOTAL_CACHE']:
+            _search_totals.clear()
+        _search_totals[key] = total
+    return total
+
+@app.before_request
+def check_not_modified():
+    """Answer repeat API GETs with 304 until a new import lands"""
+    if request.method != 'GET' or not request.path.startswith('/api/'):
+        return None
+    version = get_data_version()
+    if not version:
+        return None
+    g.etag = hashlib.blake2b(f"{version}|{request.full_path}".encode(), digest_size=16).hexdigest()
+    if request.if_none_match.contains_weak(g.etag):
+        return Response(status=304)
+    return None
+
+@app.after_request
+def add_cache_validators(response):
+    """Tag successful API responses so browsers can revalidate them"""
+    # A 304 from check_not_modified carries the same validators, so the
+    # browser's cached copy is refreshed along with its freshness lifetime
+    etag = g.pop('etag', None)
+    if etag and response.status_code in (200, 304):
+        response.set_etag(etag, weak=True)
+        if request.endpoint == 'get_regions':
+            response.cache_control.max_age = app.config['REGIONS_CACHE_MAX_AGE']
+        else:
+            response.cache_control.max_age = app.config['API_CACHE_MAX_AGE']
+    return response
+
+def response_encoding():
+    """Pick the best compression the client accepts, or None"""
+    for name in ('br', 'gzip'):
+        if (name != 'br' or brotli) and name in request.accept_encodings:
+            return name
+    return None
+
+@app.after_request
+def compress_response(response):
+    """Compress JSON responses large enough to be worth it"""
+    if (response.mimetype != 'application/json' or response.is_streamed
+            or response.direct_passthrough or 'Content-Encoding' in response.headers):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = response_encoding()
+    data = response.get_data()
+    if encoding is None or len(data) < app.config['COMPRESS_MIN_SIZE']:
+        return response
+    if encoding == 'br':
+        response.set_data(brotli.compress(data, quality=app.config['COMPRESS_LEVEL']))
+    else:
+        response.set_data(gzip.compress(data, app.config['COMPRESS_LEVEL']))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+def compact_html(html):
+    """Strip indentation, blank lines and whole-line script comments from the page.
+    
+    Every line break is kept, so JavaScript statement boundaries and HTML
+    whitespace between elements are unchanged. This relies on the page having
+    no <pre> blocks and no string or template literal spanning lines.
+    """
+    lines = []
+    in_script = False
+    for line in html.split('\n'):
+        line = line.strip()
+        if line.startswith('<script'):
+            in_script = True
+        elif line.startswith('</script'):
+            in_script = False
+        if line and not (in_script and line.startswith('//')):
+            lines.append(line)
+    return '\n'.join(lines)
+
+@lru_cache(maxsize=1)
+def index_page(version=None, has_data=False):
+    """Encode the search page once per import: plain body, compressed bodies and ETag"""
+    # The state dropdown ships filled in, so geographic search needs no fetch.
+    # It is filled whenever the database exists, even with no tracked import.
+    states = get_states(version) if has_data else []
+    options = ''.join(f'<option value="{escape(state)}">{escape(state)}</option>' for state in states)
+    page = HTML_TEMPLATE.replace('<!-- state options -->', options, 1)
+    body = compact_html(page).encode('utf-8')
+    encoded = {'gzip': gzip.compress(body, 9)}
+    if brotli:
+        encoded['br'] = brotli.compress(body)
+    etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+    return body, encoded, etag
 
 @app.route('/')
 def index():
     """Render main search page"""
-    return render_template('index.html')
+    # The page has no template logic, so it is served straight from memory
+    has_data = os.path.exists(app.config['DATABASE'])
+    version = get_data_version() if has_data else None
+    body, encoded, etag = index_page(version, has_data)
+    
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        encoding = response_encoding()
+        response = Response(encoded[encoding] if encoding else body, mimetype='text/html')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    
+    response.set_etag(etag, weak=True)
+    response.cache_control.public = True
+    response.cache_control.max_age = app.config['PAGE_CACHE_MAX_AGE']
+    response.vary.add('Accept-Encoding')
+    return response
 
 @app.route('/api/search', methods=['GET'])
 def search():
@@ -80,10 +738,13 @@ def search():
     sort_by = request.args.get('sort_by', 'call_sign')  # Default sort column
     sort_order = request.args.get('sort_order', 'asc')  # asc or desc
     active_only = request.args.get('active_only', 'false').lower() == 'true'  # New filter
+    cursor = request.args.get('cursor', '')  # Keyset position from a previous page
+    fields = request.args.get('fields', '')  # Comma-separated result fields, default all
+    prefetch_pages = request.args.get('prefetch_pages', 1, type=int)  # Consecutive pages to return at once
     
     # Validate inputs
     if not query_value and search_type not in ['geographic', 'recent_applications']:
-        return jsonify({'error': 'Search query required'}), 400
+        return json_response({'error': 'Search query required'}, 400)
     
     # Validate per_page with higher limit
     if per_page < 1:
@@ -97,40 +758,41 @@ def search():
     
     offset = (page - 1) * per_page
     
+    # Prefetching clients can take the next few pages in one query; the rows
+    # come back as one wider batch starting at the requested page, which the
+    # client splits up again. per_page and total_pages still describe the
+    # requested page size.
+    prefetch_pages = min(max(prefetch_pages, 1), app.config['MAX_PREFETCH_PAGES'])
+    
+    # A cursor replaces OFFSET so deep pages seek straight to their first row
+    after = None
+    if cursor:
+        after = decode_cursor(cursor)
+        if after is None:
+            return json_response({'error': 'Invalid cursor'}, 400)
+    
     # Route to appropriate search handler
     if search_type in ['application_file', 'application_status', 'recent_applications']:
-        return search_applications(query_value, page, per_page, offset, search_type, sort_by, sort_order)
+        return search_applications(query_value, page, per_page, offset, search_type, sort_by, sort_order, after, fields, prefetch_pages)
     else:
-        return search_licenses(query_value, page, per_page, offset, search_type, sort_by, sort_order, active_only)
+        return search_licenses(query_value, page, per_page, offset, search_type, sort_by, sort_order, active_only, after, fields, prefetch_pages)
 
-def search_licenses(query_value, page, per_page, offset, search_type, sort_by='call_sign', sort_order='asc', active_only=False):
+def search_licenses(query_value, page, per_page, offset, search_type, sort_by='call_sign', sort_order='asc', active_only=False, after=None, fields='', prefetch_pages=1):
     """Search for license data"""
-    base_query = """
-        SELECT DISTINCT
-            h.unique_system_identifier,
-            h.call_sign,
-            h.uls_file_number,
-            h.radio_service_code,
-            h.grant_date,
-            h.expired_date,
-            h.cancellation_date,
-            h.license_status,
-            COALESCE(e.entity_name, e.last_name || ', ' || e.first_name) as entity_name,
-            e.first_name,
-            e.last_name,
-            e.frn,
-            e.street_address,
-            e.city,
-            e.state,
-            e.zip_code,
-            e.email,
-            e.phone
-        FROM PUBACC_HD h
-        LEFT JOIN PUBACC_EN e ON h.unique_system_identifier = e.unique_system_identifier
+    base_query = f"""
+        SELECT
+            {result_columns(LICENSE_RESULT_COLUMNS, fields, ('type', 'unique_system_identifier'))},
+            page.sort_key,
+            page.total_count
+        FROM page
+        JOIN PUBACC_HD h ON h.unique_system_identifier = page.unique_system_identifier
+        {licensee_join('h.unique_system_identifier')}
     """
     
     where_clause = ""
     params = []
+    # Only the frn, name and geographic filters need PUBACC_EN to pick rows
+    entity_filter = search_type in ['frn', 'name', 'geographic']
     
     if search_type == 'callsign':
         where_clause = "WHERE h.call_sign = ?"
@@ -145,31 +807,8 @@ def search_licenses(query_value, page, per_page, offset, search_type, sort_by='c
         params = [query_value]
         
     elif search_type == 'name':
-        # Parse name (could be "first last" or "last, first")
-        name_parts = query_value.replace(',', ' ').split()
-        if len(name_parts) >= 2:
-            where_clause = """
-                WHERE (
-                    (UPPER(e.first_name) LIKE ? AND UPPER(e.last_name) LIKE ?) OR
-                    (UPPER(e.first_name) LIKE ? AND UPPER(e.last_name) LIKE ?) OR
-                    UPPER(e.entity_name) LIKE ?
-                )
-            """
-            params = [
-                f"%{name_parts[0].upper()}%", f"%{name_parts[1].upper()}%",
-                f"%{name_parts[1].upper()}%", f"%{name_parts[0].upper()}%",
-                f"%{query_value.upper()}%"
-            ]
-        else:
-            where_clause = """
-                WHERE (
-                    UPPER(e.first_name) LIKE ? OR 
-                    UPPER(e.last_name) LIKE ? OR 
-                    UPPER(e.entity_name) LIKE ?
-                )
-            """
-            params = [f"%{query_value.upper()}%"] * 3
-            
+        where_clause, params = name_condition(query_value)
+        
     elif search_type == 'geographic':
         # Geographic search with multiple filters
         region = request.args.get('region', '')
@@ -183,32 +822,21 @@ def search_licenses(query_value, page, per_page, offset, search_type, sort_by='c
             params.append(state.upper())
             
         if city:
-            conditions.append("UPPER(e.city) LIKE ?")
-            params.append(f"%{city.upper()}%")
-            
-        if region:
-            # Map regions to states
-            region_states = {
-                'northeast': ['CT', 'ME', 'MA', 'NH', 'NJ', 'NY', 'PA', 'RI', 'VT'],
-                'southeast': ['AL', 'AR', 'FL', 'GA', 'KY', 'LA', 'MS', 'NC', 'SC', 'TN', 'VA', 'WV'],
-                'midwest': ['IL', 'IN', 'IA', 'KS', 'MI', 'MN', 'MO', 'NE', 'ND', 'OH', 'SD', 'WI'],
-                'southwest': ['AZ', 'NM', 'OK', 'TX'],
-                'west': ['AK', 'CA', 'CO', 'HI', 'ID', 'MT', 'NV', 'OR', 'UT', 'WA', 'WY']
-            }
+            conditions.append("e.city LIKE ?")
+            params.append(f"%{city}%")
             
-            if region.lower() in region_states:
-                states_list = region_states[region.lower()]
-                placeholders = ','.join(['?' for _ in states_list])
-                conditions.append(f"e.state IN ({placeholders})")
-                params.extend(states_list)
+        region_filter = REGION_SQL.get(region.lower())
+        if region_filter:
+            conditions.append(region_filter[0])
+            params.extend(region_filter[1])
         
         if conditions:
             where_clause = "WHERE " + " AND ".join(conditions)
         else:
-            return jsonify({'error': 'Geographic search requires at least one filter'}), 400
+            return json_response({'error': 'Geographic search requires at least one filter'}, 400)
     
     else:
-        return jsonify({'error': 'Invalid search type'}), 400
+        return json_response({'error': 'Invalid search type'}, 400)
     
     # Add active license filter if requested
     if active_only:
@@ -218,103 +846,100 @@ def search_licenses(query_value, page, per_page, offset, search_type, sort_by='c
             where_clause = "WHERE h.license_status = 'A'"
     
     # Validate and build ORDER BY clause
-    valid_sort_columns = {
-        'call_sign': 'h.call_sign',
-        'entity_name': 'entity_name',
-        'license_status': 'h.license_status',
-        'grant_date': 'h.grant_date',
-        'expired_date': 'h.expired_date',
-        'state': 'e.state',
-        'city': 'e.city',
-        'frn': 'e.frn',
-        'unique_system_identifier': 'h.unique_system_identifier',
-        'radio_service_code': 'h.radio_service_code'
-    }
-    
-    order_column = valid_sort_columns.get(sort_by, 'h.call_sign')
-    order_clause = f"ORDER BY {order_column} {sort_order.upper()}, h.call_sign ASC"
+    if sort_by not in LICENSE_SORT_COLUMNS:
+        sort_by = 'call_sign'
+    order_column = LICENSE_SORT_COLUMNS[sort_by]
+    # unique_system_identifier breaks ties so every row has a unique keyset position
+    order_clause = f"ORDER BY {order_column} {sort_order.upper()}, h.unique_system_identifier {sort_order.upper()}"
+    
+    if entity_filter:
+        filter_join = sort_join = licensee_join('h.unique_system_identifier', 'JOIN')
+    else:
+        filter_join = ""
+        sort_join = licensee_join('h.unique_system_identifier') if sort_by in ['entity_name', 'state', 'city', 'frn'] else ""
     
-    # Get total count
     count_query = f"""
-        SELECT COUNT(DISTINCT h.unique_system_identifier) as total 
-        FROM PUBACC_HD h 
-        LEFT JOIN PUBACC_EN e ON h.unique_system_identifier = e.unique_system_identifier 
+        SELECT COUNT(*) as total
+        FROM PUBACC_HD h
+        {filter_join}
         {where_clause}
     """
+    count_params = list(params)
+    
+    # Deferred join: sort and paginate narrow id rows first, then fetch the
+    # wide columns only for the ids that land on this page
+    batch_size = per_page * prefetch_pages
+    if after is not None:
+        seek, seek_params = keyset_condition(order_column, 'h.unique_system_identifier',
+                                             sort_order.lower() == 'desc', after)
+        where_clause = f"{where_clause} AND {seek}" if where_clause else f"WHERE {seek}"
+        params.extend(seek_params)
+        page_clause = "LIMIT ?"
+        params.append(batch_size)
+    else:
+        page_clause = "LIMIT ? OFFSET ?"
+        params.extend([batch_size, offset])
+    
+    # The window count is taken before LIMIT applies, so the total comes back
+    # with the page instead of from a second query. Cursor pages skip it, as
+    # it would walk every row past the cursor for a total search_total keeps.
+    total_expr = "NULL" if after is not None else "COUNT(*) OVER ()"
+    full_query = f"""
+        WITH page AS (
+            SELECT h.unique_system_identifier, {order_column} AS sort_key,
+                   {total_expr} AS total_count
+            FROM PUBACC_HD h
+            {sort_join}
+            {where_clause}
+            {order_clause} {page_clause}
+        )
+        {base_query}
+        ORDER BY page.sort_key {sort_order.upper()}, page.unique_system_identifier {sort_order.upper()}
+    """
     
-    total_result = query_db(count_query, params, one=True)
-    total_count = total_result['total'] if total_result else 0
+    results = query_db(full_query, params)
     
-    # Execute main query with pagination and sorting
-    full_query = f"{base_query} {where_clause} {order_clause} LIMIT ? OFFSET ?"
-    params.extend([per_page, offset])
+    # A cursor page only counts rows past the cursor, and an empty page past
+    # the end has no row to read the total from
+    if results and after is None:
+        total_count = search_total(count_query, count_params, results[0]['total_count'])
+    elif results or offset:
+        total_count = search_total(count_query, count_params)
+    else:
+        total_count = 0
     
-    results = query_db(full_query, params)
+    next_cursor = None
+    if len({row['unique_system_identifier'] for row in results}) == batch_size:
+        last = results[-1]
+        next_cursor = encode_cursor(last['sort_key'], last['unique_system_identifier'])
     
-    # Format results
-    formatted_results = []
-    for row in results:
-        # Handle entity name properly
-        entity_name = row['entity_name'] if row['entity_name'] else ''
-        if not entity_name and row['first_name'] and row['last_name']:
-            entity_name = f"{row['first_name']} {row['last_name']}"
-        elif not entity_name and row['last_name']:
-            entity_name = row['last_name']
-        
-        formatted_results.append({
-            'type': 'license',
-            'unique_system_identifier': row['unique_system_identifier'],
-            'call_sign': row['call_sign'] if row['call_sign'] else '',
-            'uls_file_number': row['uls_file_number'] if row['uls_file_number'] else '',
-            'radio_service_code': row['radio_service_code'] if row['radio_service_code'] else '',
-            'grant_date': row['grant_date'] if row['grant_date'] else '',
-            'expired_date': row['expired_date'] if row['expired_date'] else '',
-            'license_status': row['license_status'] if row['license_status'] else '',
-            'entity_name': entity_name,
-            'frn': row['frn'] if row['frn'] else '',
-            'address': f"{row['street_address'] or ''}, {row['city'] or ''}, {row['state'] or ''} {row['zip_code'] or ''}".strip(', '),
-            'city': row['city'] if row['city'] else '',
-            'state': row['state'] if row['state'] else '',
-            'email': row['email'] if row['email'] else '',
-            'phone': row['phone'] if row['phone'] else ''
-        })
-    
-    return jsonify({
+    # Rows are already shaped by the query; the page bookkeeping columns come last
+    fields = results[0].keys()[:-2] if results else []
+    formatted_results = [dict(zip(fields, row)) for row in results]
+    
+    return json_response({
         'results': formatted_results,
         'total': total_count,
         'page': page,
         'per_page': per_page,
         'total_pages': (total_count + per_page - 1) // per_page,
+        'prefetch_pages': prefetch_pages,
         'sort_by': sort_by,
         'sort_order': sort_order,
-        'active_only': active_only
+        'active_only': active_only,
+        'next_cursor': next_cursor
     })
 
-def search_applications(query_value, page, per_page, offset, search_type, sort_by='receipt_date', sort_order='desc'):
+def search_applications(query_value, page, per_page, offset, search_type, sort_by='receipt_date', sort_order='desc', after=None, fields='', prefetch_pages=1):
     """Search for application data"""
-    base_query = """
+    base_query = f"""
         SELECT DISTINCT
-            ad.unique_system_identifier,
-            ad.uls_file_number,
-            ad.ebf_number,
-            ad.application_purpose,
-            ad.application_status,
-            ad.receipt_date,
-            ad.notification_date,
-            COALESCE(e.entity_name, e.last_name || ', ' || e.first_name) as entity_name,
-            e.first_name,
-            e.last_name,
-            e.frn,
-            e.street_address,
-            e.city,
-            e.state,
-            e.zip_code,
-            e.email,
-            e.phone,
-            h.call_sign,
-            h.radio_service_code
-        FROM PUBACC_AD ad
-        LEFT JOIN PUBACC_EN e ON ad.unique_system_identifier = e.unique_system_identifier
+            {result_columns(APPLICATION_RESULT_COLUMNS, fields, ('type', 'uls_file_number'))},
+            page.sort_key,
+            page.total_count
+        FROM page
+        JOIN PUBACC_AD ad ON ad.rowid = page.ad_rowid
+        {licensee_join('ad.unique_system_identifier')}
         LEFT JOIN PUBACC_HD h ON ad.unique_system_identifier = h.unique_system_identifier
     """
     
@@ -334,111 +959,131 @@ def search_applications(query_value, page, per_page, offset, search_type, sort_b
         params = []
         
     else:
-        return jsonify({'error': 'Invalid application search type'}), 400
+        return json_response({'error': 'Invalid application search type'}, 400)
     
     # Validate and build ORDER BY clause for applications
-    valid_sort_columns = {
-        'uls_file_number': 'ad.uls_file_number',
-        'call_sign': 'h.call_sign',
-        'application_purpose': 'ad.application_purpose',
-        'application_status': 'ad.application_status',
-        'receipt_date': 'ad.receipt_date',
-        'entity_name': 'entity_name',
-        'frn': 'e.frn'
-    }
-    
-    order_column = valid_sort_columns.get(sort_by, 'ad.receipt_date')
-    order_clause = f"ORDER BY {order_column} {sort_order.upper()}, ad.uls_file_number ASC"
-    
-    # Get total count
+    if sort_by not in APPLICATION_SORT_COLUMNS:
+        sort_by = 'receipt_date'
+    order_column = APPLICATION_SORT_COLUMNS[sort_by]
+    # Duplicate rows can give one file number several sort values, so each file
+    # number sorts by the value it would show first, and uls_file_number breaks
+    # ties so every file number has a unique keyset position
+    sort_key = f"{'MAX' if sort_order.lower() == 'desc' else 'MIN'}({order_column})"
+    order_clause = f"ORDER BY {sort_key} {sort_order.upper()}, ad.uls_file_number {sort_order.upper()}"
+    
+    # Application filters only touch PUBACC_AD, so the other tables are joined
+    # for sorting alone
+    sort_join = ""
+    if sort_by == 'call_sign':
+        sort_join = "LEFT JOIN PUBACC_HD h ON ad.unique_system_identifier = h.unique_system_identifier"
+    elif sort_by in ['entity_name', 'frn']:
+        sort_join = licensee_join('ad.unique_system_identifier')
+    
+    # File numbers repeat in PUBACC_AD, so the count runs COUNT(*) over one row
+    # per file number, grouped along idx_ad_uls_file, rather than COUNT(DISTINCT).
+    # Recent applications match nearly all of PUBACC_AD, so rather than walk
+    # the whole table on every page the count stops once it passes the cap
+    capped = search_type == 'recent_applications'
+    count_cap = app.config['RECENT_COUNT_CAP']
     count_query = f"""
-        SELECT COUNT(DISTINCT ad.uls_file_number) as total 
-        FROM PUBACC_AD ad 
-        LEFT JOIN PUBACC_EN e ON ad.unique_system_identifier = e.unique_system_identifier
-        LEFT JOIN PUBACC_HD h ON ad.unique_system_identifier = h.unique_system_identifier
-        {where_clause}
+        SELECT COUNT(*) as total
+        FROM (
+            SELECT ad.uls_file_number FROM PUBACC_AD ad
+            {where_clause}
+            GROUP BY ad.uls_file_number
+            {'LIMIT ?' if capped else ''}
+        )
+    """
+    count_params = list(params)
+    if capped:
+        count_params.append(count_cap + 1)
+    
+    # Deferred join: paginate file numbers first, then fetch the wide columns.
+    # One extra file number is fetched to tell whether another page follows.
+    # The seek compares the grouped sort key, so it goes in HAVING: filtering
+    # rows before grouping could bring a file number back on a later page
+    batch_size = per_page * prefetch_pages
+    having_clause = ""
+    if after is not None:
+        seek, seek_params = keyset_condition(sort_key, 'ad.uls_file_number',
+                                             sort_order.lower() == 'desc', after)
+        having_clause = f"HAVING {seek}"
+        params.extend(seek_params)
+        page_clause = "LIMIT ?"
+        params.append(batch_size + 1)
+    else:
+        page_clause = "LIMIT ? OFFSET ?"
+        params.extend([batch_size + 1, offset])
+    
+    # A window count would make SQLite visit every match, so it is skipped
+    # when the count is capped and on cursor pages, whose total is cached.
+    # Each file number is shown through one AD row that passed the filters;
+    # joining back on the file number would also bring in its other rows
+    total_expr = "NULL" if capped or after is not None else "COUNT(*) OVER ()"
+    full_query = f"""
+        WITH page AS (
+            SELECT ad.uls_file_number, MIN(ad.rowid) AS ad_rowid,
+                   {sort_key} AS sort_key, {total_expr} AS total_count
+            FROM PUBACC_AD ad
+            {sort_join}
+            {where_clause}
+            GROUP BY ad.uls_file_number
+            {having_clause}
+            {order_clause} {page_clause}
+        )
+        {base_query}
+        ORDER BY page.sort_key {sort_order.upper()}, page.uls_file_number {sort_order.upper()}
     """
     
-    total_result = query_db(count_query, params, one=True)
-    total_count = total_result['total'] if total_result else 0
+    results = query_db(full_query, params)
     
-    # Execute main query with pagination and sorting
-    full_query = f"{base_query} {where_clause} {order_clause} LIMIT ? OFFSET ?"
-    params.extend([per_page, offset])
+    has_more = len({row['uls_file_number'] for row in results}) > batch_size
+    if has_more:
+        extra = results[-1]['uls_file_number']
+        results = [row for row in results if row['uls_file_number'] != extra]
     
-    results = query_db(full_query, params)
+    if results and after is None and not capped:
+        total_count = search_total(count_query, count_params, results[0]['total_count'])
+    elif results or offset or capped:
+        total_count = search_total(count_query, count_params)
+    else:
+        total_count = 0
+    total_capped = capped and total_count > count_cap
+    if total_capped:
+        total_count = count_cap
     
-    # Format results
-    formatted_results = []
-    for row in results:
-        # Map application purpose codes
-        purpose_map = {
-            'NE': 'New',
-            'AM': 'Amendment',
-            'RO': 'Renewal Only',
-            'RM': 'Renewal/Modification',
-            'AU': 'Administrative Update',
-            'CA': 'Cancellation',
-            'MD': 'Modification',
-            'WD': 'Withdrawal'
-        }
-        
-        # Map application status codes
-        status_map = {
-            'P': 'Pending',
-            'A': 'Accepted',
-            'G': 'Granted',
-            'D': 'Dismissed',
-            'W': 'Withdrawn',
-            'Q': 'Accepted in Part',
-            'T': 'Terminated',
-            'K': 'Killed',
-            'R': 'Returned',
-            'I': 'In Progress'
-        }
-        
-        # Handle entity name properly
-        entity_name = row['entity_name'] if row['entity_name'] else ''
-        if not entity_name and row['first_name'] and row['last_name']:
-            entity_name = f"{row['first_name']} {row['last_name']}"
-        elif not entity_name and row['last_name']:
-            entity_name = row['last_name']
-        
-        formatted_results.append({
-            'type': 'application',
-            'unique_system_identifier': row['unique_system_identifier'],
-            'uls_file_number': row['uls_file_number'] if row['uls_file_number'] else '',
-            'ebf_number': row['ebf_number'] if row['ebf_number'] else '',
-            'call_sign': row['call_sign'] if row['call_sign'] else 'N/A',
-            'radio_service_code': row['radio_service_code'] if row['radio_service_code'] else '',
-            'application_purpose': purpose_map.get(row['application_purpose'], row['application_purpose'] or ''),
-            'application_purpose_code': row['application_purpose'] if row['application_purpose'] else '',
-            'application_status': status_map.get(row['application_status'], row['application_status'] or ''),
-            'application_status_code': row['application_status'] if row['application_status'] else '',
-            'receipt_date': row['receipt_date'] if row['receipt_date'] else '',
-            'notification_date': row['notification_date'] if row['notification_date'] else '',
-            'entity_name': entity_name,
-            'frn': row['frn'] if row['frn'] else '',
-            'address': f"{row['street_address'] or ''}, {row['city'] or ''}, {row['state'] or ''} {row['zip_code'] or ''}".strip(', '),
-            'email': row['email'] if row['email'] else '',
-            'phone': row['phone'] if row['phone'] else ''
-        })
-    
-    return jsonify({
+    next_cursor = None
+    if has_more:
+        last = results[-1]
+        next_cursor = encode_cursor(last['sort_key'], last['uls_file_number'])
+    
+    # Rows are already shaped by the query; the page bookkeeping columns come last
+    fields = results[0].keys()[:-2] if results else []
+    formatted_results = [dict(zip(fields, row)) for row in results]
+    
+    return json_response({
         'results': formatted_results,
         'total': total_count,
         'page': page,
         'per_page': per_page,
         'total_pages': (total_count + per_page - 1) // per_page,
+        'prefetch_pages': prefetch_pages,
         'sort_by': sort_by,
-        'sort_order': sort_order
+        'sort_order': sort_order,
+        'next_cursor': next_cursor,
+        'has_more': has_more,
+        'total_capped': total_capped
     })
 
-@app.route('/api/export/csv', methods=['POST'])
+@app.route('/api/export/csv', methods=['GET', 'POST'])
 def export_csv():
     """Export search results to CSV"""
-    # Get search parameters from POST body
-    data = request.get_json()
+    # Search parameters come from the query string (download links) or a JSON body
+    if request.method == 'POST':
+        data = request.get_json()
+    else:
+        data = request.args.to_dict()
+        data['active_only'] = data.get('active_only', 'false').lower() == 'true'
     search_type = data.get('type', 'callsign')
     query_value = data.get('q', '')
     
@@ -472,7 +1117,6 @@ def export_licenses_csv(data, search_type, query_value):
             e.email,
             e.phone
         FROM PUBACC_HD h
-        LEFT JOIN PUBACC_EN e ON h.unique_system_identifier = e.unique_system_identifier
     """
     
     where_clause = ""
@@ -488,29 +1132,7 @@ def export_licenses_csv(data, search_type, query_value):
         where_clause = "WHERE h.unique_system_identifier = ?"
         params = [query_value]
     elif search_type == 'name':
-        name_parts = query_value.replace(',', ' ').split()
-        if len(name_parts) >= 2:
-            where_clause = """
-                WHERE (
-                    (UPPER(e.first_name) LIKE ? AND UPPER(e.last_name) LIKE ?) OR
-                    (UPPER(e.first_name) LIKE ? AND UPPER(e.last_name) LIKE ?) OR
-                    UPPER(e.entity_name) LIKE ?
-                )
-            """
-            params = [
-                f"%{name_parts[0].upper()}%", f"%{name_parts[1].upper()}%",
-                f"%{name_parts[1].upper()}%", f"%{name_parts[0].upper()}%",
-                f"%{query_value.upper()}%"
-            ]
-        else:
-            where_clause = """
-                WHERE (
-                    UPPER(e.first_name) LIKE ? OR 
-                    UPPER(e.last_name) LIKE ? OR 
-                    UPPER(e.entity_name) LIKE ?
-                )
-            """
-            params = [f"%{query_value.upper()}%"] * 3
+        where_clause, params = name_condition(query_value)
     elif search_type == 'geographic':
         # Build geographic where clause
         region = data.get('region', '')
@@ -522,12 +1144,22 @@ def export_licenses_csv(data, search_type, query_value):
             conditions.append("e.state = ?")
             params.append(state.upper())
         if city:
-            conditions.append("UPPER(e.city) LIKE ?")
-            params.append(f"%{city.upper()}%")
+            conditions.append("e.city LIKE ?")
+            params.append(f"%{city}%")
+        region_filter = REGION_SQL.get(region.lower())
+        if region_filter:
+            conditions.append(region_filter[0])
+            params.extend(region_filter[1])
         
         if conditions:
             where_clause = "WHERE " + " AND ".join(conditions)
     
+    # Entity filters can use an inner join, which lets them drive the plan
+    if search_type in ['frn', 'name', 'geographic'] and where_clause:
+        entity_join = licensee_join('h.unique_system_identifier', 'JOIN')
+    else:
+        entity_join = licensee_join('h.unique_system_identifier')
+    
     # Add active license filter if requested
     active_only = data.get('active_only', False)
     if active_only:
@@ -536,57 +1168,33 @@ def export_licenses_csv(data, search_type, query_value):
         else:
             where_clause = "WHERE h.license_status = 'A'"
     
-    # Limit exports to reasonable amount (but much higher than before)
-    full_query = f"{base_query} {where_clause} ORDER BY h.call_sign LIMIT {app.config['MAX_EXPORT_RESULTS']}"
-    results = query_db(full_query, params)
-    
-    # Create CSV
-    output = io.StringIO()
-    writer = csv.writer(output)
+    # Limit exports to reasonable amount (but much higher than before); the
+    # limit is bound so the SQL text, and its cached statement, stay the same
+    full_query = f"{base_query} {entity_join} {where_clause} ORDER BY h.call_sign LIMIT ?"
+    params.append(app.config['MAX_EXPORT_RESULTS'])
     
-    # Write headers
-    writer.writerow([
+    header = [
         'Call Sign', 'ULS File Number', 'System ID', 'Service Code',
         'Grant Date', 'Expiration Date', 'Status', 'Entity Name',
         'First Name', 'Last Name', 'FRN', 'Street Address',
         'City', 'State', 'ZIP', 'Email', 'Phone'
-    ])
-    
-    # Write data
-    for row in results:
-        writer.writerow([
-            row['call_sign'] or '', row['uls_file_number'] or '', row['unique_system_identifier'] or '',
-            row['radio_service_code'] or '', row['grant_date'] or '', row['expired_date'] or '',
-            row['license_status'] or '', row['entity_name'] or '', row['first_name'] or '',
-            row['last_name'] or '', row['frn'] or '', row['street_address'] or '',
-            row['city'] or '', row['state'] or '', row['zip_code'] or '', row['email'] or '', row['phone'] or ''
-        ])
-    
-    # Create response
-    output.seek(0)
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    ]
     
-    return Response(
-        output.getvalue(),
-        mimetype='text/csv',
-        headers={
-            'Content-Disposition': f'attachment; filename=uls_licenses_export_{timestamp}.csv'
-        }
-    )
+    return stream_csv(full_query, params, header, 'uls_licenses_export')
 
 def export_applications_csv(data, search_type, query_value):
     """Export application data to CSV"""
-    base_query = """
+    base_query = f"""
         SELECT 
             ad.uls_file_number,
             ad.ebf_number,
             ad.unique_system_identifier,
+            h.call_sign,
+            h.radio_service_code,
             ad.application_purpose,
             ad.application_status,
             ad.receipt_date,
             ad.notification_date,
-            h.call_sign,
-            h.radio_service_code,
             COALESCE(e.entity_name, e.last_name || ', ' || e.first_name) as entity_name,
             e.first_name,
             e.last_name,
@@ -598,7 +1206,7 @@ def export_applications_csv(data, search_type, query_value):
             e.email,
             e.phone
         FROM PUBACC_AD ad
-        LEFT JOIN PUBACC_EN e ON ad.unique_system_identifier = e.unique_system_identifier
+        {licensee_join('ad.unique_system_identifier')}
         LEFT JOIN PUBACC_HD h ON ad.unique_system_identifier = h.unique_system_identifier
     """
     
@@ -615,126 +1223,104 @@ def export_applications_csv(data, search_type, query_value):
         where_clause = "WHERE ad.receipt_date IS NOT NULL"
         params = []
     
-    # Limit exports
-    full_query = f"{base_query} {where_clause} ORDER BY ad.receipt_date DESC LIMIT {app.config['MAX_EXPORT_RESULTS']}"
-    results = query_db(full_query, params)
-    
-    # Create CSV
-    output = io.StringIO()
-    writer = csv.writer(output)
+    # Limit exports (bound, like the license export)
+    full_query = f"{base_query} {where_clause} ORDER BY ad.receipt_date DESC LIMIT ?"
+    params.append(app.config['MAX_EXPORT_RESULTS'])
     
-    # Write headers
-    writer.writerow([
+    header = [
         'ULS File Number', 'EBF Number', 'System ID', 'Call Sign', 'Service Code',
         'Purpose', 'Status', 'Receipt Date', 'Notification Date',
         'Entity Name', 'First Name', 'Last Name', 'FRN',
         'Street Address', 'City', 'State', 'ZIP', 'Email', 'Phone'
-    ])
-    
-    # Write data
-    for row in results:
-        writer.writerow([
-            row['uls_file_number'] or '', row['ebf_number'] or '', row['unique_system_identifier'] or '',
-            row['call_sign'] or '', row['radio_service_code'] or '',
-            row['application_purpose'] or '', row['application_status'] or '',
-            row['receipt_date'] or '', row['notification_date'] or '',
-            row['entity_name'] or '', row['first_name'] or '', row['last_name'] or '', row['frn'] or '',
-            row['street_address'] or '', row['city'] or '', row['state'] or '', row['zip_code'] or '',
-            row['email'] or '', row['phone'] or ''
-        ])
-    
-    # Create response
-    output.seek(0)
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    ]
     
-    return Response(
-        output.getvalue(),
-        mimetype='text/csv',
-        headers={
-            'Content-Disposition': f'attachment; filename=uls_applications_export_{timestamp}.csv'
-        }
-    )
+    return stream_csv(full_query, params, header, 'uls_applications_export')
 
 @app.route('/api/license/<callsign>')
 def get_license_detail(callsign):
     """Get detailed license information"""
-    # Get main license data
-    license_data = query_db("""
-        SELECT h.*, e.*, 
-               am.operator_class as amateur_class,
-               am.previous_callsign,
-               am.vanity_callsign_change
-        FROM PUBACC_HD h
-        LEFT JOIN PUBACC_EN e ON h.unique_system_identifier = e.unique_system_identifier
-        LEFT JOIN PUBACC_AM am ON h.call_sign = am.callsign
-        WHERE h.call_sign = ?
-    """, [callsign.upper()], one=True)
-    
-    if not license_data:
-        return jsonify({'error': 'License not found'}), 404
-    
-    # Get location data
-    locations = query_db("""
+    # The lookups keyed only by call sign run concurrently with the main query
+    locations_future = _detail_executor.submit(query_dicts, """
         SELECT * FROM PUBACC_LO 
         WHERE call_sign = ?
         ORDER BY location_number
     """, [callsign.upper()])
     
-    # Get frequency data
-    frequencies = query_db("""
+    frequencies_future = _detail_executor.submit(query_dicts, """
         SELECT * FROM PUBACC_FR
         WHERE call_sign = ?
         ORDER BY location_number, frequency_assigned
     """, [callsign.upper()])
     
-    # Get history
-    history = query_db("""
+    history_future = _detail_executor.submit(query_dicts, """
         SELECT * FROM PUBACC_HS
         WHERE callsign = ?
         ORDER BY log_date DESC
         LIMIT 20
     """, [callsign.upper()])
     
-    # Get related applications
-    applications = query_db("""
+    # Get main license data; only the first joined row is returned, so the
+    # other entity rows are never built
+    license_rows = query_dicts("""
+        SELECT h.*, e.*, 
+               am.operator_class as amateur_class,
+               am.previous_callsign,
+               am.vanity_callsign_change
+        FROM PUBACC_HD h
+        LEFT JOIN PUBACC_EN e ON h.unique_system_identifier = e.unique_system_identifier
+        LEFT JOIN PUBACC_AM am ON h.call_sign = am.callsign
+        WHERE h.call_sign = ?
+        LIMIT 1
+    """, [callsign.upper()])
+    
+    if not license_rows:
+        for future in (locations_future, frequencies_future, history_future):
+            future.cancel()
+        return json_response({'error': 'License not found'}, 404)
+    
+    license_data = license_rows[0]
+    
+    # Related applications hang off the system id the call sign resolved to
+    applications = query_dicts("""
         SELECT * FROM PUBACC_AD
         WHERE unique_system_identifier = ?
         ORDER BY receipt_date DESC
         LIMIT 10
     """, [license_data['unique_system_identifier']])
     
-    return jsonify({
-        'license': dict(license_data),
-        'locations': [dict(l) for l in locations],
-        'frequencies': [dict(f) for f in frequencies],
-        'history': [dict(h) for h in history],
-        'applications': [dict(a) for a in applications]
+    return json_response({
+        'license': license_data,
+        'locations': locations_future.result(),
+        'frequencies': frequencies_future.result(),
+        'history': history_future.result(),
+        'applications': applications
     })
 
 @app.route('/api/application/<file_number>')
 def get_application_detail(file_number):
     """Get detailed application information"""
-    # Get main application data
-    app_data = query_db("""
+    attachments_future = _detail_executor.submit(query_dicts, """
+        SELECT * FROM PUBACC_AT
+        WHERE uls_file_number = ?
+    """, [file_number])
+    
+    # Get main application data (first joined row only, as above)
+    app_rows = query_dicts("""
         SELECT ad.*, e.*, h.call_sign, h.radio_service_code
         FROM PUBACC_AD ad
         LEFT JOIN PUBACC_EN e ON ad.unique_system_identifier = e.unique_system_identifier
         LEFT JOIN PUBACC_HD h ON ad.unique_system_identifier = h.unique_system_identifier
         WHERE ad.uls_file_number = ?
-    """, [file_number], one=True)
-    
-    if not app_data:
-        return jsonify({'error': 'Application not found'}), 404
-    
-    # Get attachments
-    attachments = query_db("""
-        SELECT * FROM PUBACC_AT
-        WHERE uls_file_number = ?
+        LIMIT 1
     """, [file_number])
     
-    return jsonify({
-        'application': dict(app_data),
-        'attachments': [dict(a) for a in attachments]
+    if not app_rows:
+        attachments_future.cancel()
+        return json_response({'error': 'Application not found'}, 404)
+    
+    return json_response({
+        'application': app_rows[0],
+        'attachments': attachments_future.result()
     })
 
 @app.route('/api/license/<callsign>/pdf')
@@ -742,11 +1328,13 @@ def generate_license_pdf(callsign):
     """Generate a PDF license for a given callsign"""
     try:
         conn = get_db()
-        pdf_buffer = create_license_pdf_from_callsign(conn, callsign)
-        conn.close()
+        try:
+            pdf_buffer = create_license_pdf_from_callsign(conn, callsign)
+        finally:
+            release_db(conn)
         
         if pdf_buffer is None:
-            return jsonify({'error': 'Failed to generate PDF'}), 500
+            return json_response({'error': 'Failed to generate PDF'}, 500)
         
         return Response(
             pdf_buffer.getvalue(),
@@ -756,14 +1344,36 @@ def generate_license_pdf(callsign):
             }
         )
     except ValueError as e:
-        return jsonify({'error': str(e)}), 404
+        return json_response({'error': str(e)}, 404)
     except Exception as e:
         logger.error(f"Error generating PDF: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
+        return json_response({'error': 'Internal server error'}, 500)
+
+def get_cached_stats(version=None):
+    """Read the statistics the importer precomputed into uls_stats, if present and current"""
+    if not query_db("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'uls_stats'", one=True):
+        return None
+    cached = {row['k']: row['v'] for row in query_db("SELECT k, v FROM uls_stats")}
+    if not all(key in cached for key in STATS_KEYS):
+        return None
+    stats = {key: json.loads(cached[key]) for key in STATS_KEYS}
+    # An import that skipped the refresh leaves figures from an older version
+    if version and stats['last_update'] != version:
+        return None
+    return stats
 
 @app.route('/api/stats')
 def get_stats():
     """Get database statistics"""
+    return json_response(load_stats(get_data_version()))
+
+@lru_cache(maxsize=1)
+def load_stats(version=None):
+    """Collect database statistics, cached until the import version changes"""
+    stats = get_cached_stats(version)
+    if stats:
+        return stats
+    
     stats = {}
     
     # Total licenses
@@ -801,26 +1411,16 @@ def get_stats():
     """, one=True)
     stats['last_update'] = result['last_update'] if result and result['last_update'] else 'Unknown'
     
-    return jsonify(stats)
+    return stats
 
 @app.route('/api/regions')
 def get_regions():
     """Get available regions and states"""
-    return jsonify({
-        'regions': [
-            {'code': 'northeast', 'name': 'Northeast'},
-            {'code': 'southeast', 'name': 'Southeast'},
-            {'code': 'midwest', 'name': 'Midwest'},
-            {'code': 'southwest', 'name': 'Southwest'},
-            {'code': 'west', 'name': 'West'}
-        ],
-        'states': get_states()
+    return json_response({
+        'regions': REGIONS,
+        'states': get_states(get_data_version())
     })
 
-# Create templates directory and HTML template
-if not os.path.exists('templates'):
-    os.makedirs('templates')
-
 # HTML template content (saved as templates/index.html)
 HTML_TEMPLATE = '''<!DOCTYPE html>
 <html lang="en">
@@ -853,7 +1453,7 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
         .checkbox-filter label { cursor: pointer; font-size: 14px; user-select: none; }
         .geographic-filters { display: none; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 10px; margin-bottom: 20px; }
         .geographic-filters.active { display: grid; }
-        .results { background: white; padding: 20px; border-radius: 8px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); overflow-x: auto; }
+        .results { background: white; padding: 20px; border-radius: 8px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); overflow-x: auto; contain: layout paint style; }
         .results-header { display: flex; justify-content: space-between; align-items: center; margin-bottom: 20px; padding-bottom: 10px; border-bottom: 2px solid #ecf0f1; flex-wrap: wrap; gap: 10px; }
         .results-count { color: #7f8c8d; }
         .results-controls { display: flex; gap: 10px; align-items: center; }
@@ -869,6 +1469,9 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
         th.sorted-asc::after { content: ' ↑'; opacity: 1; color: #3498db; }
         th.sorted-desc::after { content: ' ↓'; opacity: 1; color: #3498db; }
         td { padding: 12px 8px; border-bottom: 1px solid #ecf0f1; }
+        .table-window { max-height: 70vh; overflow-y: auto; }
+        .table-window th { position: sticky; top: 0; z-index: 1; }
+        .table-window .spacer td { padding: 0; border: none; }
         tr:hover { background: #f8f9fa; }
         .pagination { display: flex; justify-content: center; gap: 5px; margin-top: 20px; flex-wrap: wrap; }
         .pagination button { padding: 8px 12px; border: 1px solid #ddd; background: white; cursor: pointer; border-radius: 3px; }
@@ -942,6 +1545,7 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
                 </select>
                 <select id="stateSelect">
                     <option value="">Select State...</option>
+                    <!-- state options -->
                 </select>
                 <input type="text" id="cityInput" placeholder="City...">
             </div>
@@ -976,7 +1580,7 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
                 <div class="results-controls">
                     <div class="per-page-selector">
                         <label for="perPageSelect">Show:</label>
-                        <select id="perPageSelect" onchange="changePerPage(this.value)">
+                        <select id="perPageSelect">
                             <option value="25">25</option>
                             <option value="50" selected>50</option>
                             <option value="100">100</option>
@@ -1006,48 +1610,74 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
         let currentSortOrder = 'asc';
         let currentPerPage = 50;
         let activeOnly = false;
+        let nextCursor = null;
+        let pageCursor = null;
+        let latestResults = null;
+        
+        // Search responses, fetched or prefetched, as promises keyed by searchKey()
+        // and evicted least recently used first
+        const searchCache = new Map();
+        const SEARCH_CACHE_LIMIT = 32;
+        
+        // Once the user pages forward, prefetches take this many pages per request
+        const PREFETCH_PAGES = 2;
+        let pagingForward = false;
+        
+        // Pages longer than this render only the rows scrolled into view
+        const VIRTUAL_ROW_THRESHOLD = 100;
+        const VIRTUAL_ROW_BUFFER = 10;
+        
+        // Aborts the search in flight when a newer one starts
+        let currentController = null;
+        const SEARCH_DEBOUNCE_MS = 150;
         
         // Tab switching
-        document.querySelectorAll('.tabs .tab').forEach(tab => {
-            tab.addEventListener('click', function() {
-                document.querySelectorAll('.tabs .tab').forEach(t => t.classList.remove('active'));
-                this.classList.add('active');
-                currentCategory = this.dataset.category;
-                
-                document.getElementById('licenseSearch').style.display = currentCategory === 'license' ? 'block' : 'none';
-                document.getElementById('applicationSearch').style.display = currentCategory === 'application' ? 'block' : 'none';
-                document.getElementById('results').style.display = 'none';
-                
-                if (currentCategory === 'application') {
-                    currentSearchType = 'application_file';
-                    currentSortBy = 'receipt_date';
-                    currentSortOrder = 'desc';
-                } else {
-                    currentSearchType = 'callsign';
-                    currentSortBy = 'call_sign';
-                    currentSortOrder = 'asc';
-                }
-            });
-        });
+        function switchCategory(tab) {
+            currentCategory = tab.dataset.category;
+            
+            document.getElementById('licenseSearch').style.display = currentCategory === 'license' ? 'block' : 'none';
+            document.getElementById('applicationSearch').style.display = currentCategory === 'application' ? 'block' : 'none';
+            document.getElementById('results').style.display = 'none';
+            
+            if (currentCategory === 'application') {
+                currentSearchType = 'application_file';
+                currentSortBy = 'receipt_date';
+                currentSortOrder = 'desc';
+            } else {
+                currentSearchType = 'callsign';
+                currentSortBy = 'call_sign';
+                currentSortOrder = 'asc';
+            }
+        }
         
-        // License search type buttons
-        document.querySelectorAll('#licenseSearch .search-type button').forEach(btn => {
-            btn.addEventListener('click', function() {
-                document.querySelectorAll('#licenseSearch .search-type button').forEach(b => b.classList.remove('active'));
-                this.classList.add('active');
-                currentSearchType = this.dataset.type;
-                updateSearchUI();
-            });
-        });
+        // Moves the active highlight to this control within its group
+        function setActive(control) {
+            const previous = control.parentElement.querySelector('.active');
+            if (previous) {
+                previous.classList.remove('active');
+            }
+            control.classList.add('active');
+        }
         
-        // Application search type buttons
-        document.querySelectorAll('#applicationSearch .search-type button').forEach(btn => {
-            btn.addEventListener('click', function() {
-                document.querySelectorAll('#applicationSearch .search-type button').forEach(b => b.classList.remove('active'));
-                this.classList.add('active');
-                currentSearchType = this.dataset.type;
-                updateAppSearchUI();
-            });
+        // One listener covers the tabs and both sets of search type buttons
+        document.body.addEventListener('click', (e) => {
+            const tab = e.target.closest('.tabs .tab');
+            if (tab) {
+                setActive(tab);
+                switchCategory(tab);
+                return;
+            }
+            
+            const typeButton = e.target.closest('.search-type button');
+            if (typeButton) {
+                setActive(typeButton);
+                currentSearchType = typeButton.dataset.type;
+                if (typeButton.closest('#licenseSearch')) {
+                    updateSearchUI();
+                } else {
+                    updateAppSearchUI();
+                }
+            }
         });
         
         // Active only checkbox
@@ -1063,7 +1693,6 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
                 input.style.display = 'none';
                 input.required = false;
                 geoFilters.classList.add('active');
-                loadStates();
             } else {
                 input.style.display = 'block';
                 input.required = true;
@@ -1102,44 +1731,167 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
             }
         }
         
-        async function loadStates() {
-            try {
-                const response = await fetch('/api/regions');
-                const data = await response.json();
-                const select = document.getElementById('stateSelect');
-                select.innerHTML = '<option value="">Select State...</option>';
-                data.states.forEach(state => {
-                    select.innerHTML += `<option value="${state}">${state}</option>`;
-                });
-            } catch (error) {
-                console.error('Error loading states:', error);
-            }
+        function debounce(fn, delay) {
+            let timer;
+            return () => {
+                clearTimeout(timer);
+                timer = setTimeout(fn, delay);
+            };
         }
         
+        // Repeated submits, sort clicks and page size changes within the debounce
+        // window collapse into one search; page changes stay immediate, as they
+        // are usually served from the prefetch cache
+        const debouncedSearch = debounce(performSearch, SEARCH_DEBOUNCE_MS);
+        
         function changePerPage(value) {
             currentPerPage = parseInt(value);
             currentPage = 1;
-            performSearch();
+            debouncedSearch();
         }
         
         // License search form
-        document.getElementById('searchForm').addEventListener('submit', async (e) => {
+        document.getElementById('searchForm').addEventListener('submit', (e) => {
             e.preventDefault();
+            searchCache.clear();
+            pagingForward = false;
             currentPage = 1;
-            await performSearch();
+            debouncedSearch();
         });
         
         // Application search form
-        document.getElementById('appSearchForm').addEventListener('submit', async (e) => {
+        document.getElementById('appSearchForm').addEventListener('submit', (e) => {
             e.preventDefault();
+            searchCache.clear();
+            pagingForward = false;
             currentPage = 1;
-            await performSearch();
+            debouncedSearch();
         });
         
-        async function performSearch() {
+        function searchQuery(params) {
+            return new URLSearchParams(Object.keys(params).sort().map(key => [key, params[key]])).toString();
+        }
+        
+        function searchKey(params) {
+            // A cursor only changes how the server finds the page, not what is
+            // on it, so pages reached by cursor or by number share an entry
+            const {cursor, ...rest} = params;
+            return searchQuery(rest);
+        }
+        
+        function cacheSearch(key, request) {
+            searchCache.delete(key);
+            if (searchCache.size >= SEARCH_CACHE_LIMIT) {
+                searchCache.delete(searchCache.keys().next().value);
+            }
+            searchCache.set(key, request);
+            request.catch(() => {
+                if (searchCache.get(key) === request) {
+                    searchCache.delete(key);
+                }
+            });
+        }
+        
+        async function cachedSearch(key) {
+            const request = searchCache.get(key);
+            if (!request) {
+                return null;
+            }
+            // Re-insert to mark the entry as most recently used
+            searchCache.delete(key);
+            searchCache.set(key, request);
+            try {
+                return await request;
+            } catch (error) {
+                return null;
+            }
+        }
+        
+        function splitPages(data, perPage) {
+            // Cut a multi-page response back into pages of perPage distinct rows
+            const rowKey = row => row.type === 'application' ? row.uls_file_number : row.unique_system_identifier;
+            const chunks = [];
+            let chunk = [];
+            let keys = new Set();
+            
+            data.results.forEach(row => {
+                const key = rowKey(row);
+                if (!keys.has(key) && keys.size === perPage) {
+                    chunks.push(chunk);
+                    chunk = [];
+                    keys = new Set();
+                }
+                keys.add(key);
+                chunk.push(row);
+            });
+            if (chunk.length) {
+                chunks.push(chunk);
+            }
+            
+            // Only the last page knows where the following one starts
+            return chunks.map((results, i) => {
+                const last = i === chunks.length - 1;
+                const page = {
+                    ...data,
+                    results,
+                    page: data.page + i,
+                    per_page: perPage,
+                    total_pages: Math.ceil(data.total / perPage),
+                    next_cursor: last ? data.next_cursor : null
+                };
+                if ('has_more' in data) {
+                    page.has_more = last ? data.has_more : true;
+                }
+                return page;
+            });
+        }
+        
+        function prefetchNextPage(data) {
+            if (!(data.page < data.total_pages || data.has_more)) {
+                return;
+            }
+            
+            const nextParams = {...currentSearchParams, page: data.page + 1};
+            delete nextParams.cursor;
+            if (nextCursor) {
+                nextParams.cursor = nextCursor;
+            }
+            
+            const key = searchKey(nextParams);
+            if (searchCache.has(key)) {
+                return;
+            }
+            
+            const pages = pagingForward ? PREFETCH_PAGES : 1;
+            const query = searchQuery(pages > 1 ? {...nextParams, prefetch_pages: pages} : nextParams);
+            const request = fetch(`/api/search?${query}`).then(response => {
+                if (!response.ok) {
+                    throw new Error('Prefetch failed');
+                }
+                return response.json();
+            }).then(combined => splitPages(combined, nextParams.per_page));
+            
+            // Each page gets its own entry, resolving once the shared request lands
+            for (let i = 0; i < pages; i++) {
+                cacheSearch(searchKey({...nextParams, page: nextParams.page + i}), request.then(split => {
+                    if (!split[i]) {
+                        throw new Error('Page past the end of the results');
+                    }
+                    return split[i];
+                }));
+            }
+        }
+        
+        async function performSearch({fromHistory = false} = {}) {
             const loading = document.getElementById('loading');
             const results = document.getElementById('results');
             
+            if (currentController) {
+                currentController.abort();
+            }
+            const controller = new AbortController();
+            currentController = controller;
+            
             loading.style.display = 'block';
             results.style.display = 'none';
             
@@ -1149,9 +1901,16 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
                 page: currentPage,
                 per_page: currentPerPage,
                 sort_by: currentSortBy,
-                sort_order: currentSortOrder
+                sort_order: currentSortOrder,
+                fields: RESULT_FIELDS[currentCategory]
             };
             
+            // Seek straight to the next page when stepping forward
+            if (pageCursor) {
+                currentSearchParams.cursor = pageCursor;
+                pageCursor = null;
+            }
+            
             if (currentCategory === 'license') {
                 // Add active only filter
                 currentSearchParams.active_only = activeOnly;
@@ -1174,19 +1933,44 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
             }
             
             try {
-                const params = new URLSearchParams(currentSearchParams);
-                const response = await fetch(`/api/search?${params}`);
-                const data = await response.json();
+                const key = searchKey(currentSearchParams);
+                let data = await cachedSearch(key);
                 
-                if (response.ok) {
-                    displayResults(data);
-                } else {
-                    alert('Error: ' + (data.error || 'Search failed'));
+                if (!data) {
+                    const response = await fetch(`/api/search?${searchQuery(currentSearchParams)}`, {signal: controller.signal});
+                    data = await response.json();
+                    
+                    if (!response.ok) {
+                        if (!controller.signal.aborted) {
+                            alert('Error: ' + (data.error || 'Search failed'));
+                        }
+                        return;
+                    }
+                    cacheSearch(key, Promise.resolve(data));
+                }
+                
+                // A newer search has started; leave the page to it
+                if (controller.signal.aborted) {
+                    return;
+                }
+                
+                displayResults(data);
+                prefetchNextPage(data);
+                
+                // Record the search in the URL so back/forward and links can restore it
+                const state = historyQuery(currentSearchParams);
+                if (!fromHistory && location.hash.slice(1) !== state) {
+                    history.pushState(null, '', `#${state}`);
                 }
             } catch (error) {
-                alert('Error performing search: ' + error.message);
+                if (error.name !== 'AbortError') {
+                    alert('Error performing search: ' + error.message);
+                }
             } finally {
-                loading.style.display = 'none';
+                if (currentController === controller) {
+                    currentController = null;
+                    loading.style.display = 'none';
+                }
             }
         }
         
@@ -1199,10 +1983,138 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
                 currentSortOrder = 'asc';
             }
             currentPage = 1;
-            performSearch();
+            debouncedSearch();
+        }
+        
+        function element(tag, className, text) {
+            const el = document.createElement(tag);
+            if (className) {
+                el.className = className;
+            }
+            el.textContent = text;
+            return el;
+        }
+        
+        function pdfButton(row) {
+            // PDF download is only offered for amateur radio licenses
+            if (row.radio_service_code !== 'HA' || !row.call_sign) {
+                return '-';
+            }
+            const button = element('button', 'action-btn', '📄 PDF');
+            button.dataset.callsign = row.call_sign;
+            return button;
+        }
+        
+        // Badge classes by status code, built once instead of per row
+        function statusClasses(codes) {
+            return Object.freeze(Object.fromEntries(codes.map(code => [code, `status-badge status-${code}`])));
+        }
+        
+        const LICENSE_STATUS_CLASS = statusClasses(['A', 'C', 'E', 'L', 'P', 'T', 'X']);
+        const APPLICATION_STATUS_CLASS = statusClasses(['P', 'A', 'G', 'D', 'W', 'Q', 'T', 'K', 'R', 'I']);
+        
+        // Result table columns: [sort key, heading, cell formatter]; cells
+        // without a formatter show the sort key's field as text
+        const APPLICATION_COLUMNS = [
+            ['uls_file_number', 'File Number', row => element('strong', '', row.uls_file_number || '')],
+            ['call_sign', 'Call Sign', row => row.call_sign || 'N/A'],
+            ['application_purpose', 'Purpose'],
+            ['application_status', 'Status', row => element('span', APPLICATION_STATUS_CLASS[row.application_status_code || 'P'] || 'status-badge', row.application_status || '')],
+            ['receipt_date', 'Receipt Date'],
+            ['entity_name', 'Applicant'],
+            ['frn', 'FRN']
+        ];
+        
+        const LICENSE_COLUMNS = [
+            ['call_sign', 'Call Sign', row => element('strong', '', row.call_sign || '')],
+            ['entity_name', 'Name'],
+            ['frn', 'FRN'],
+            ['unique_system_identifier', 'ULS ID'],
+            ['license_status', 'Status', row => element('span', LICENSE_STATUS_CLASS[row.license_status] || 'status-badge status-U', row.license_status || '')],
+            ['grant_date', 'Grant Date'],
+            ['expired_date', 'Expiration'],
+            ['state', 'State'],
+            [null, 'Actions', pdfButton]
+        ];
+        
+        // Only the fields the table shows are requested from /api/search
+        const RESULT_FIELDS = {
+            license: 'call_sign,entity_name,frn,unique_system_identifier,license_status,grant_date,expired_date,state,radio_service_code',
+            application: 'uls_file_number,call_sign,application_purpose,application_status,application_status_code,receipt_date,entity_name,frn'
+        };
+        
+        function buildRow(row, columns) {
+            const tr = document.createElement('tr');
+            columns.forEach(([sortKey, label, format]) => {
+                const value = format ? format(row) : (row[sortKey] || '');
+                const td = document.createElement('td');
+                if (value instanceof Node) {
+                    td.appendChild(value);
+                } else {
+                    td.textContent = value;
+                }
+                tr.appendChild(td);
+            });
+            return tr;
+        }
+        
+        function spacerRow(columnCount) {
+            const tr = element('tr', 'spacer', '');
+            const td = tr.appendChild(document.createElement('td'));
+            td.colSpan = columnCount;
+            return tr;
+        }
+        
+        function renderVirtualRows(view, tbody, rows, columns) {
+            const topSpacer = spacerRow(columns.length);
+            const bottomSpacer = spacerRow(columns.length);
+            let rowHeight = 0;
+            let renderedStart = -1;
+            let frame = null;
+            // Rows in the current window by index, reused while they stay in view
+            let built = new Map();
+            
+            const render = () => {
+                frame = null;
+                if (!rowHeight) {
+                    // Row height is measured once from a real row and assumed uniform
+                    tbody.replaceChildren(buildRow(rows[0], columns));
+                    rowHeight = tbody.firstChild.getBoundingClientRect().height;
+                    if (!rowHeight) {
+                        // Not laid out yet; try again on the next frame
+                        frame = requestAnimationFrame(render);
+                        return;
+                    }
+                }
+                
+                const start = Math.max(0, Math.floor(view.scrollTop / rowHeight) - VIRTUAL_ROW_BUFFER);
+                if (start === renderedStart) {
+                    return;
+                }
+                renderedStart = start;
+                const end = Math.min(rows.length, start + Math.ceil(view.clientHeight / rowHeight) + 2 * VIRTUAL_ROW_BUFFER);
+                
+                topSpacer.firstChild.style.height = `${start * rowHeight}px`;
+                bottomSpacer.firstChild.style.height = `${(rows.length - end) * rowHeight}px`;
+                const windowRows = new Map();
+                for (let i = start; i < end; i++) {
+                    windowRows.set(i, built.get(i) || buildRow(rows[i], columns));
+                }
+                built = windowRows;
+                tbody.replaceChildren(topSpacer, ...windowRows.values(), bottomSpacer);
+            };
+            
+            view.addEventListener('scroll', () => {
+                if (!frame) {
+                    frame = requestAnimationFrame(render);
+                }
+            });
+            // The results panel is shown after this returns, so measure on the next frame
+            frame = requestAnimationFrame(render);
         }
         
         function displayResults(data) {
+            latestResults = data;
             const results = document.getElementById('results');
             const resultsCount = document.getElementById('resultsCount');
             const resultsTable = document.getElementById('resultsTable');
@@ -1210,8 +2122,9 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
             
             // Update per page selector
             document.getElementById('perPageSelect').value = data.per_page;
+            nextCursor = data.next_cursor || null;
             
-            let countText = `Found ${data.total.toLocaleString()} results`;
+            let countText = `Found ${data.total.toLocaleString()}${data.total_capped ? '+' : ''} results`;
             if (data.active_only) {
                 countText += ' (active only)';
             }
@@ -1219,156 +2132,249 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
             resultsCount.textContent = countText;
             
             if (data.results.length === 0) {
-                resultsTable.innerHTML = '<p>No results found</p>';
-                pagination.innerHTML = '';
+                resultsTable.replaceChildren(element('p', '', 'No results found'));
+                pagination.replaceChildren();
                 results.style.display = 'block';
                 return;
             }
             
             // Build table based on result type
-            const isApplication = data.results[0].type === 'application';
-            let html = '<table><thead><tr>';
+            const columns = data.results[0].type === 'application' ? APPLICATION_COLUMNS : LICENSE_COLUMNS;
+            const table = document.createElement('table');
+            const headerRow = table.createTHead().insertRow();
+            
+            columns.forEach(([sortKey, label]) => {
+                const th = element('th', '', label);
+                if (sortKey) {
+                    th.className = data.sort_by === sortKey ? `sortable sorted-${data.sort_order}` : 'sortable';
+                    th.dataset.column = sortKey;
+                }
+                headerRow.appendChild(th);
+            });
             
-            if (isApplication) {
-                html += `<th class="sortable ${data.sort_by === 'uls_file_number' ? 'sorted-' + data.sort_order : ''}" onclick="sortBy('uls_file_number')">File Number</th>`;
-                html += `<th class="sortable ${data.sort_by === 'call_sign' ? 'sorted-' + data.sort_order : ''}" onclick="sortBy('call_sign')">Call Sign</th>`;
-                html += `<th class="sortable ${data.sort_by === 'application_purpose' ? 'sorted-' + data.sort_order : ''}" onclick="sortBy('application_purpose')">Purpose</th>`;
-                html += `<th class="sortable ${data.sort_by === 'application_status' ? 'sorted-' + data.sort_order : ''}" onclick="sortBy('application_status')">Status</th>`;
-                html += `<th class="sortable ${data.sort_by === 'receipt_date' ? 'sorted-' + data.sort_order : ''}" onclick="sortBy('receipt_date')">Receipt Date</th>`;
-                html += `<th class="sortable ${data.sort_by === 'entity_name' ? 'sorted-' + data.sort_order : ''}" onclick="sortBy('entity_name')">Applicant</th>`;
-                html += `<th class="sortable ${data.sort_by === 'frn' ? 'sorted-' + data.sort_order : ''}" onclick="sortBy('frn')">FRN</th>`;
+            const tbody = document.createElement('tbody');
+            table.appendChild(tbody);
+            
+            if (data.results.length > VIRTUAL_ROW_THRESHOLD) {
+                // Long pages scroll inside a window that only mounts the rows in view
+                const view = element('div', 'table-window', '');
+                view.appendChild(table);
+                resultsTable.replaceChildren(view);
+                renderVirtualRows(view, tbody, data.results, columns);
             } else {
-                html += `<th class="sortable ${data.sort_by === 'call_sign' ? 'sorted-' + data.sort_order : ''}" onclick="sortBy('call_sign')">Call Sign</th>`;
-                html += `<th class="sortable ${data.sort_by === 'entity_name' ? 'sorted-' + data.sort_order : ''}" onclick="sortBy('entity_name')">Name</th>`;
-                html += `<th class="sortable ${data.sort_by === 'frn' ? 'sorted-' + data.sort_order : ''}" onclick="sortBy('frn')">FRN</th>`;
-                html += `<th class="sortable ${data.sort_by === 'unique_system_identifier' ? 'sorted-' + data.sort_order : ''}" onclick="sortBy('unique_system_identifier')">ULS ID</th>`;
-                html += `<th class="sortable ${data.sort_by === 'license_status' ? 'sorted-' + data.sort_order : ''}" onclick="sortBy('license_status')">Status</th>`;
-                html += `<th class="sortable ${data.sort_by === 'grant_date' ? 'sorted-' + data.sort_order : ''}" onclick="sortBy('grant_date')">Grant Date</th>`;
-                html += `<th class="sortable ${data.sort_by === 'expired_date' ? 'sorted-' + data.sort_order : ''}" onclick="sortBy('expired_date')">Expiration</th>`;
-                html += `<th class="sortable ${data.sort_by === 'state' ? 'sorted-' + data.sort_order : ''}" onclick="sortBy('state')">State</th>`;
-                html += '<th>Actions</th>';
+                const fragment = document.createDocumentFragment();
+                data.results.forEach(row => fragment.appendChild(buildRow(row, columns)));
+                tbody.appendChild(fragment);
+                resultsTable.replaceChildren(table);
             }
             
-            html += '</tr></thead><tbody>';
-            
-            data.results.forEach(row => {
-                html += '<tr>';
-                
-                if (isApplication) {
-                    const statusClass = `status-${row.application_status_code || 'P'}`;
-                    html += `<td><strong>${row.uls_file_number || ''}</strong></td>`;
-                    html += `<td>${row.call_sign || 'N/A'}</td>`;
-                    html += `<td>${row.application_purpose || ''}</td>`;
-                    html += `<td><span class="status-badge ${statusClass}">${row.application_status || ''}</span></td>`;
-                    html += `<td>${row.receipt_date || ''}</td>`;
-                    html += `<td>${row.entity_name || ''}</td>`;
-                    html += `<td>${row.frn || ''}</td>`;
-                } else {
-                    const statusClass = `status-${row.license_status || 'U'}`;
-                    html += `<td><strong>${row.call_sign || ''}</strong></td>`;
-                    html += `<td>${row.entity_name || ''}</td>`;
-                    html += `<td>${row.frn || ''}</td>`;
-                    html += `<td>${row.unique_system_identifier || ''}</td>`;
-                    html += `<td><span class="status-badge ${statusClass}">${row.license_status || ''}</span></td>`;
-                    html += `<td>${row.grant_date || ''}</td>`;
-                    html += `<td>${row.expired_date || ''}</td>`;
-                    html += `<td>${row.state || ''}</td>`;
-                    
-                    // Add PDF download button for amateur radio licenses
-                    if (row.radio_service_code === 'HA' && row.call_sign) {
-                        html += `<td><button onclick="downloadLicensePDF('${row.call_sign}')" class="action-btn">📄 PDF</button></td>`;
-                    } else {
-                        html += `<td>-</td>`;
-                    }
+            // Show the table now; the pagination controls can wait for an idle moment
+            results.style.display = 'block';
+            pagination.replaceChildren();
+            const schedule = window.requestIdleCallback || setTimeout;
+            schedule(() => {
+                if (latestResults === data) {
+                    renderPagination(data);
                 }
-                
-                html += '</tr>';
-            });
+            }, window.requestIdleCallback ? {timeout: 200} : 0);
+        }
+        
+        function renderPagination(data) {
+            const pagination = document.getElementById('pagination');
             
-            html += '</tbody></table>';
-            resultsTable.innerHTML = html;
+            // A lone page needs no controls
+            const hasNext = data.page < data.total_pages || data.has_more;
+            if (data.page === 1 && !hasNext) {
+                pagination.replaceChildren();
+                return;
+            }
             
-            // Build pagination
-            let pageHtml = '';
+            const buttons = [];
+            const pageButton = (label, page, className = '') => {
+                const button = element('button', className, label);
+                button.dataset.page = page;
+                buttons.push(button);
+            };
             
             if (data.page > 1) {
-                pageHtml += '<button onclick="changePage(1)">First</button>';
-                pageHtml += `<button onclick="changePage(${data.page - 1})">Previous</button>`;
+                pageButton('First', 1);
+                pageButton('Previous', data.page - 1);
             }
             
-            const maxPages = Math.min(data.total_pages, 10);
             const startPage = Math.max(1, data.page - 5);
             const endPage = Math.min(data.total_pages, startPage + 9);
             
             for (let i = startPage; i <= endPage; i++) {
-                const active = i === data.page ? 'active' : '';
-                pageHtml += `<button class="${active}" onclick="changePage(${i})">${i}</button>`;
+                pageButton(String(i), i, i === data.page ? 'active' : '');
             }
             
-            if (data.page < data.total_pages) {
-                pageHtml += `<button onclick="changePage(${data.page + 1})">Next</button>`;
-                pageHtml += `<button onclick="changePage(${data.total_pages})">Last</button>`;
+            if (hasNext) {
+                pageButton('Next', data.page + 1);
+                if (!data.total_capped) {
+                    pageButton('Last', data.total_pages);
+                }
             }
             
-            pagination.innerHTML = pageHtml;
-            results.style.display = 'block';
+            pagination.replaceChildren(...buttons);
         }
         
+        // One listener serves every page button
+        document.getElementById('pagination').addEventListener('click', (e) => {
+            const page = e.target.dataset.page;
+            if (page) {
+                changePage(parseInt(page));
+            }
+        });
+        
+        // Likewise for the sortable headers and PDF buttons in the results table
+        document.getElementById('resultsTable').addEventListener('click', (e) => {
+            const th = e.target.closest('th.sortable');
+            if (th) {
+                sortBy(th.dataset.column);
+                return;
+            }
+            
+            const button = e.target.closest('button[data-callsign]');
+            if (button) {
+                downloadLicensePDF(button.dataset.callsign);
+            }
+        });
+        
+        document.getElementById('perPageSelect').addEventListener('change', function() {
+            changePerPage(this.value);
+        });
+        
         function changePage(page) {
+            pagingForward = page === currentPage + 1;
+            pageCursor = pagingForward ? nextCursor : null;
             currentPage = page;
             performSearch();
             window.scrollTo(0, 0);
         }
         
+        function historyQuery(params) {
+            // The cursor and field list are rebuilt on restore, so keep the URL short
+            const {cursor, fields, ...rest} = params;
+            return searchQuery(rest);
+        }
+        
+        async function restoreSearch(params) {
+            const type = params.get('type') || 'callsign';
+            const category = ['application_file', 'application_status', 'recent_applications'].includes(type) ? 'application' : 'license';
+            
+            // Drive the same controls a user would, so the form matches the results
+            document.querySelector(`.tabs .tab[data-category="${category}"]`).click();
+            const typeButton = document.querySelector(`#${category}Search .search-type button[data-type="${type}"]`);
+            if (typeButton) {
+                typeButton.click();
+            }
+            
+            currentSortBy = params.get('sort_by') || currentSortBy;
+            currentSortOrder = params.get('sort_order') || currentSortOrder;
+            currentPerPage = parseInt(params.get('per_page')) || currentPerPage;
+            currentPage = parseInt(params.get('page')) || 1;
+            pageCursor = null;
+            
+            const q = params.get('q') || '';
+            if (category === 'license') {
+                activeOnly = params.get('active_only') === 'true';
+                document.getElementById('activeOnlyCheckbox').checked = activeOnly;
+                if (type === 'geographic') {
+                    document.getElementById('regionSelect').value = params.get('region') || '';
+                    document.getElementById('cityInput').value = params.get('city') || '';
+                    document.getElementById('stateSelect').value = params.get('state') || '';
+                } else {
+                    document.getElementById('searchInput').value = q;
+                }
+            } else if (type === 'application_status') {
+                document.getElementById('appStatusSelect').value = q;
+            } else if (type === 'application_file') {
+                document.getElementById('appSearchInput').value = q;
+            }
+            
+            await performSearch({fromHistory: true});
+        }
+        
+        function restoreFromHash() {
+            const state = location.hash.slice(1);
+            if (state) {
+                restoreSearch(new URLSearchParams(state));
+            } else {
+                document.getElementById('results').style.display = 'none';
+            }
+        }
+        
         function downloadLicensePDF(callsign) {
             window.location.href = `/api/license/${callsign}/pdf`;
         }
         
         // Export to CSV
-        document.getElementById('exportBtn').addEventListener('click', async () => {
+        document.getElementById('exportBtn').addEventListener('click', () => {
             const params = {...currentSearchParams};
             delete params.page;
             delete params.per_page;
             delete params.sort_by;
             delete params.sort_order;
+            delete params.cursor;
+            delete params.fields;
             
-            try {
-                const response = await fetch('/api/export/csv', {
-                    method: 'POST',
-                    headers: {'Content-Type': 'application/json'},
-                    body: JSON.stringify(params)
-                });
-                
-                if (response.ok) {
-                    const blob = await response.blob();
-                    const url = window.URL.createObjectURL(blob);
-                    const a = document.createElement('a');
-                    a.href = url;
-                    a.download = `uls_export_${new Date().getTime()}.csv`;
-                    document.body.appendChild(a);
-                    a.click();
-                    document.body.removeChild(a);
-                    window.URL.revokeObjectURL(url);
-                } else {
-                    alert('Export failed');
-                }
-            } catch (error) {
-                alert('Error exporting data: ' + error.message);
-            }
+            // A plain link lets the browser stream the file to disk as it arrives
+            const a = document.createElement('a');
+            a.href = `/api/export/csv?${new URLSearchParams(params)}`;
+            a.download = '';
+            document.body.appendChild(a);
+            a.click();
+            document.body.removeChild(a);
         });
+        
+        // Back/forward between searches, plus deep links on first load
+        window.addEventListener('popstate', restoreFromHash);
+        if (location.hash.length > 1) {
+            restoreFromHash();
+        }
     </script>
 </body>
 </html>'''
 
-# Save the HTML template
-with open('templates/index.html', 'w') as f:
-    f.write(HTML_TEMPLATE)
+# Readers only need WAL set up once, before the first request, and the
+# state list is read now so the first page load does not wait on it
+if os.path.exists(app.config['DATABASE']):
+    enable_wal()
+    optimize_db()
+    get_states(get_data_version())
+
+def save_template():
+    """Write HTML_TEMPLATE to templates/index.html if the file is missing or stale"""
+    path = os.path.join('templates', 'index.html')
+    try:
+        with open(path, encoding='utf-8') as f:
+            if f.read() == HTML_TEMPLATE:
+                return
+    except FileNotFoundError:
+        pass
+    
+    os.makedirs('templates', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(HTML_TEMPLATE)
 
 if __name__ == '__main__':
+    # Keep the on-disk copy of the page in step for anyone editing it
+    save_template()
+    
     # Check if database exists
     if not os.path.exists(app.config['DATABASE']):
         logger.warning(f"Database not found at {app.config['DATABASE']}")
         logger.warning("Please run the import script first to create the database")
     
-    # Run the application
-    app.run(debug=True, host='0.0.0.0', port=5120)
\ No newline at end of file
+    # Run the application: waitress when installed (thread pool, keep-alive),
+    # otherwise Flask's threaded server. ULS_DEBUG=1 brings back the debugger.
+    if os.environ.get('ULS_DEBUG') == '1':
+        app.run(debug=True, host='0.0.0.0', port=app.config['PORT'])
+    else:
+        try:
+            from waitress import serve
+        except ImportError:
+            logger.info("waitress not installed; using Flask's built-in server")
+            app.run(debug=False, threaded=True, host='0.0.0.0', port=app.config['PORT'])
+        else:
+            serve(app, host='0.0.0.0', port=app.config['PORT'], threads=app.config['SERVER_THREADS'])
\ No newline at end of file
@@ -12,6 +12,7 @@ import os
 import sys
 import logging
 import argparse
+import json
 from datetime import datetime
 from pathlib import Path
 import csv
@@ -121,6 +122,7 @@ class ULSImporter:
         
         # Create indexes for better performance
         self.create_indexes()
+        self.create_name_search_index()
         
         # Create import tracking table
         self.create_import_tracking_table()
@@ -161,18 +163,25 @@ class ULSImporter:
             "CREATE INDEX IF NOT EXISTS idx_hd_call_sign ON PUBACC_HD(call_sign)",
             "CREATE INDEX IF NOT EXISTS idx_hd_uls_file ON PUBACC_HD(uls_file_number)",
             "CREATE INDEX IF NOT EXISTS idx_hd_unique_id ON PUBACC_HD(unique_system_identifier)",
-            "CREATE INDEX IF NOT EXISTS idx_hd_status ON PUBACC_HD(license_status)",
+            # Also covers the per-service counts of active licenses in the stats
+            "CREATE INDEX IF NOT EXISTS idx_hd_status_service ON PUBACC_HD(license_status, radio_service_code)",
             "CREATE INDEX IF NOT EXISTS idx_hd_service ON PUBACC_HD(radio_service_code)",
             "CREATE INDEX IF NOT EXISTS idx_hd_grant_date ON PUBACC_HD(grant_date)",
+            "CREATE INDEX IF NOT EXISTS idx_hd_call_sign_unique_id ON PUBACC_HD(call_sign, unique_system_identifier)",
             
             # Entity table indexes
             "CREATE INDEX IF NOT EXISTS idx_en_unique_id ON PUBACC_EN(unique_system_identifier)",
             "CREATE INDEX IF NOT EXISTS idx_en_licensee_id ON PUBACC_EN(licensee_id)",
             "CREATE INDEX IF NOT EXISTS idx_en_entity_name ON PUBACC_EN(entity_name)",
             "CREATE INDEX IF NOT EXISTS idx_en_frn ON PUBACC_EN(frn)",
+            "CREATE INDEX IF NOT EXISTS idx_en_frn_unique_id ON PUBACC_EN(frn, unique_system_identifier)",
             "CREATE INDEX IF NOT EXISTS idx_en_last_name ON PUBACC_EN(last_name)",
             "CREATE INDEX IF NOT EXISTS idx_en_state ON PUBACC_EN(state)",
             "CREATE INDEX IF NOT EXISTS idx_en_city ON PUBACC_EN(city)",
+            "CREATE INDEX IF NOT EXISTS idx_en_state_city ON PUBACC_EN(state, city)",
+            "CREATE INDEX IF NOT EXISTS idx_en_person_name ON PUBACC_EN(last_name, first_name)",
+            # Covers the web app's pick of one licensee row per license
+            "CREATE INDEX IF NOT EXISTS idx_en_unique_id_type ON PUBACC_EN(unique_system_identifier, entity_type)",
             
             # Location table indexes
             "CREATE INDEX IF NOT EXISTS idx_lo_call_sign ON PUBACC_LO(call_sign)",
@@ -184,17 +193,28 @@ class ULSImporter:
             "CREATE INDEX IF NOT EXISTS idx_fr_call_sign ON PUBACC_FR(call_sign)",
             "CREATE INDEX IF NOT EXISTS idx_fr_frequency ON PUBACC_FR(call_sign, location_number, antenna_number)",
             "CREATE INDEX IF NOT EXISTS idx_fr_freq_assigned ON PUBACC_FR(frequency_assigned)",
+            "CREATE INDEX IF NOT EXISTS idx_fr_location_freq ON PUBACC_FR(call_sign, location_number, frequency_assigned)",
             
             # Application data indexes
             "CREATE INDEX IF NOT EXISTS idx_ad_uls_file ON PUBACC_AD(uls_file_number)",
             "CREATE INDEX IF NOT EXISTS idx_ad_unique_id ON PUBACC_AD(unique_system_identifier)",
             "CREATE INDEX IF NOT EXISTS idx_ad_receipt_date ON PUBACC_AD(receipt_date)",
+            "CREATE INDEX IF NOT EXISTS idx_ad_receipt_file ON PUBACC_AD(receipt_date DESC, uls_file_number DESC)",
             "CREATE INDEX IF NOT EXISTS idx_ad_status ON PUBACC_AD(application_status)",
+            # PUBACC_AD may hold several rows per file number, and the web app
+            # groups them itself. A unique index here would make INSERT OR IGNORE
+            # silently drop the later rows, so remove it where earlier versions
+            # created it.
+            "DROP INDEX IF EXISTS uq_ad_file",
             
             # History table indexes
             "CREATE INDEX IF NOT EXISTS idx_hs_call_sign ON PUBACC_HS(callsign)",
             "CREATE INDEX IF NOT EXISTS idx_hs_uls_file ON PUBACC_HS(uls_file_number)",
             "CREATE INDEX IF NOT EXISTS idx_hs_date ON PUBACC_HS(log_date)",
+            "CREATE INDEX IF NOT EXISTS idx_hs_call_sign_date ON PUBACC_HS(callsign, log_date DESC)",
+            
+            # Attachment table indexes
+            "CREATE INDEX IF NOT EXISTS idx_at_uls_file ON PUBACC_AT(uls_file_number)",
             
             # Amateur table indexes
             "CREATE INDEX IF NOT EXISTS idx_am_callsign ON PUBACC_AM(callsign)",
@@ -212,6 +232,59 @@ class ULSImporter:
         self.conn.commit()
         logger.info(f"Created {len(indexes)} indexes")
         
+    def create_name_search_index(self):
+        """Create the trigram full-text index used for entity name searches"""
+        self.cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'PUBACC_EN_FTS'"
+        )
+        if self.cursor.fetchone():
+            return
+            
+        logger.info("Creating name search index...")
+        
+        # External content table: the text stays in PUBACC_EN and the triggers
+        # keep the index in step with inserts, updates and deletes
+        statements = [
+            """
+            CREATE VIRTUAL TABLE PUBACC_EN_FTS USING fts5(
+                first_name, last_name, entity_name,
+                content='PUBACC_EN', content_rowid='rowid', tokenize='trigram'
+            )
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_en_fts_insert AFTER INSERT ON PUBACC_EN BEGIN
+                INSERT INTO PUBACC_EN_FTS(rowid, first_name, last_name, entity_name)
+                VALUES (new.rowid, new.first_name, new.last_name, new.entity_name);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_en_fts_delete AFTER DELETE ON PUBACC_EN BEGIN
+                INSERT INTO PUBACC_EN_FTS(PUBACC_EN_FTS, rowid, first_name, last_name, entity_name)
+                VALUES ('delete', old.rowid, old.first_name, old.last_name, old.entity_name);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_en_fts_update AFTER UPDATE ON PUBACC_EN BEGIN
+                INSERT INTO PUBACC_EN_FTS(PUBACC_EN_FTS, rowid, first_name, last_name, entity_name)
+                VALUES ('delete', old.rowid, old.first_name, old.last_name, old.entity_name);
+                INSERT INTO PUBACC_EN_FTS(rowid, first_name, last_name, entity_name)
+                VALUES (new.rowid, new.first_name, new.last_name, new.entity_name);
+            END
+            """,
+            # Index any rows that were loaded before the table existed
+            "INSERT INTO PUBACC_EN_FTS(PUBACC_EN_FTS) VALUES ('rebuild')",
+        ]
+        
+        try:
+            for statement in statements:
+                self.cursor.execute(statement)
+            self.conn.commit()
+            logger.info("Created name search index")
+        except sqlite3.Error as e:
+            # Needs SQLite 3.34+ built with FTS5; name search falls back to LIKE
+            self.conn.rollback()
+            logger.warning(f"Error creating name search index: {e}")
+            
     def create_import_tracking_table(self):
         """Create table to track imports for update management"""
         sql = """
@@ -606,12 +679,72 @@ class ULSImporter:
             
         return stats
         
+    def refresh_stats(self):
+        """Precompute the web app's summary statistics into uls_stats"""
+        logger.info("Refreshing summary statistics...")
+        
+        counts = [
+            ('total_licenses', "SELECT COUNT(*) FROM PUBACC_HD"),
+            ('active_licenses', "SELECT COUNT(*) FROM PUBACC_HD WHERE license_status = 'A'"),
+            ('total_applications', "SELECT COUNT(DISTINCT uls_file_number) FROM PUBACC_AD"),
+            ('pending_applications', "SELECT COUNT(*) FROM PUBACC_AD WHERE application_status = 'P'"),
+        ]
+        
+        try:
+            self.cursor.execute(
+                "CREATE TABLE IF NOT EXISTS uls_stats (k TEXT PRIMARY KEY, v TEXT)"
+            )
+            
+            stats = {}
+            for key, sql in counts:
+                self.cursor.execute(sql)
+                stats[key] = self.cursor.fetchone()[0]
+                
+            self.cursor.execute("""
+                SELECT radio_service_code, COUNT(*)
+                FROM PUBACC_HD
+                WHERE license_status = 'A'
+                GROUP BY radio_service_code
+                ORDER BY COUNT(*) DESC
+                LIMIT 10
+            """)
+            stats['top_services'] = [
+                {'radio_service_code': code, 'count': count}
+                for code, count in self.cursor.fetchall()
+            ]
+            
+            self.cursor.execute(
+                "SELECT MAX(import_date) FROM import_tracking WHERE status = 'completed'"
+            )
+            stats['last_update'] = self.cursor.fetchone()[0] or 'Unknown'
+            
+            # Values are stored as JSON so counts and the service list keep their types
+            self.cursor.executemany(
+                "INSERT OR REPLACE INTO uls_stats (k, v) VALUES (?, ?)",
+                [(key, json.dumps(value)) for key, value in stats.items()]
+            )
+            self.conn.commit()
+            logger.info("Summary statistics refreshed")
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            logger.warning(f"Error refreshing summary statistics: {e}")
+            
     def vacuum_database(self):
         """Optimize database by running VACUUM"""
         logger.info("Vacuuming database (this may take a while)...")
         try:
             self.cursor.execute("VACUUM")
             logger.info("Database vacuum completed")
+            
+            # PUBACC_EN has no INTEGER PRIMARY KEY, so VACUUM may renumber its
+            # rowids and leave the name index pointing at the wrong entities
+            self.cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'PUBACC_EN_FTS'"
+            )
+            if self.cursor.fetchone():
+                logger.info("Rebuilding name search index...")
+                self.cursor.execute("INSERT INTO PUBACC_EN_FTS(PUBACC_EN_FTS) VALUES ('rebuild')")
+                self.conn.commit()
         except sqlite3.Error as e:
             logger.error(f"Error vacuuming database: {e}")
             
@@ -652,6 +785,12 @@ Examples:
   # Show database status
   %(prog)s --db uls.db --status
   
+  # Add missing indexes to an existing database
+  %(prog)s --db uls.db --indexes
+  
+  # Recompute the web app's summary statistics
+  %(prog)s --db uls.db --refresh-stats
+  
   # Optimize database
   %(prog)s --db uls.db --vacuum --analyze
         """
@@ -677,6 +816,10 @@ Examples:
                        help='Show import status and database statistics')
     parser.add_argument('--pattern', default='*.zip', 
                        help='File pattern for directory import (default: *.zip)')
+    parser.add_argument('--indexes', action='store_true',
+                       help='Create any missing indexes on an existing database')
+    parser.add_argument('--refresh-stats', action='store_true',
+                       help='Recompute the summary statistics served by the web app')
     parser.add_argument('--vacuum', action='store_true',
                        help='Vacuum database to reclaim space and optimize')
     parser.add_argument('--analyze', action='store_true',
@@ -730,6 +873,22 @@ Examples:
                 import_type=args.import_type
             )
             
+        # Create missing indexes
+        if args.indexes:
+            importer.create_indexes()
+            importer.create_name_search_index()
+            importer.analyze_database()
+            
+        imported = args.license_file or args.app_file or args.import_file or args.import_dir
+        
+        # Imports change the counts behind /api/stats
+        if args.refresh_stats or imported:
+            importer.refresh_stats()
+            
+        # ...and the table statistics the query planner picks indexes by
+        if imported and not args.analyze and not args.indexes:
+            importer.analyze_database()
+            
         # Vacuum database
         if args.vacuum:
             importer.vacuum_database()
@@ -740,7 +899,8 @@ Examples:
             
         # Show status
         if args.status or (not any([args.schema, args.import_file, args.license_file, 
-                                     args.app_file, args.import_dir, args.vacuum, args.analyze])):
+                                     args.app_file, args.import_dir, args.indexes,
+                                     args.refresh_stats, args.vacuum, args.analyze])):
             print("\n" + "="*70)
             print("DATABASE STATUS")
             print("="*70)
@@ -0,0 +1,21 @@
+"""
+WSGI entry point for uls-webapp.py
+The hyphenated file name can't be imported directly, so this loads it by path:
+    gunicorn wsgi:app
+"""
+
+import importlib.util
+import os
+import sys
+
+_here = os.path.dirname(os.path.abspath(__file__))
+# uls-webapp.py imports license_pdf_generator from this directory
+if _here not in sys.path:
+    sys.path.insert(0, _here)
+
+_spec = importlib.util.spec_from_file_location('uls_webapp', os.path.join(_here, 'uls-webapp.py'))
+uls_webapp = importlib.util.module_from_spec(_spec)
+sys.modules['uls_webapp'] = uls_webapp
+_spec.loader.exec_module(uls_webapp)
+
+app = uls_webapp.app